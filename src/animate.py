@@ -0,0 +1,210 @@
+import argparse
+import collections
+import contextlib
+import logging
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, GifImagePlugin
+
+import data_processor
+import art_generator
+import render_cache
+
+
+def iter_frame_jobs(index, start_year, end_year):
+    """
+    List the (month, year, temp, rain) of every month with data in a year range, in order.
+
+    Args:
+        index (data_processor.WeatherIndex): The weather data.
+        start_year (int): First year of the animation.
+        end_year (int): Last year of the animation (inclusive).
+
+    Yields:
+        tuple: (month, year, temp, rain).
+    """
+    for year in range(start_year, end_year + 1):
+        for month in range(1, 13):
+            temp, rain = index.lookup(month, year)
+            if temp is not None:
+                yield month, year, temp, rain
+
+
+def render_frame(month, year, temp, rain, size):
+    """
+    Render one animation frame at the requested size.
+
+    Frames are drawn at their final size rather than downscaled from a full
+    render, and reuse the pooled texture of their temperature band, so
+    consecutive frames in the same band share textures instead of rebuilding them.
+    """
+    return art_generator.render_art(
+        temp, rain, reuse_texture=True, seed=render_cache.seed_for(month, year), size=(size, size)
+    )
+
+
+def encode_gif_frame(job, size, duration):
+    """
+    Render a frame and encode it as a self-contained GIF image block. Runs inside a worker process.
+
+    Each frame carries its own color table, so frames can be quantized
+    independently and written as soon as they are ready.
+
+    Args:
+        job (tuple): (month, year, temp, rain).
+        size (int): Frame width and height in pixels.
+        duration (int): Frame duration in milliseconds.
+
+    Returns:
+        bytes: Graphic control extension, image descriptor, color table and LZW data.
+    """
+    frame = render_frame(*job, size).quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    return b"".join(GifImagePlugin.getdata(frame, duration=duration, include_color_table=True))
+
+
+def save_png_frame(job, size, path):
+    """Render a frame and save it as a PNG. Runs inside a worker process."""
+    art_generator.save_image(render_frame(*job, size), path)
+    return path
+
+
+def ordered_results(executor, fn, jobs, max_in_flight):
+    """
+    Run fn over jobs in parallel and yield the results in job order.
+
+    At most max_in_flight jobs are queued or finished-but-unconsumed at once,
+    so memory stays bounded however long the animation is.
+
+    Args:
+        executor (concurrent.futures.Executor): Pool to run the jobs on.
+        fn (callable): Function called with each job's arguments.
+        jobs (iterable): Argument tuples.
+        max_in_flight (int): Upper bound on pending results.
+
+    Yields:
+        The result of each job, in order.
+    """
+    pending = collections.deque()
+    for args in jobs:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def gif_header(size, loop=0):
+    """Return a GIF89a header with no global color table and a NETSCAPE looping extension."""
+    screen = b"GIF89a" + struct.pack("<HHBBB", size, size, 0, 0, 0)
+    netscape = b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00"
+    return screen + netscape
+
+
+def export_gif(jobs, output_path, size=600, fps=8, workers=None, max_in_flight=None):
+    """
+    Render frames in parallel and stream them into an animated GIF in order.
+
+    If rendering fails or is interrupted, the partially written GIF is removed.
+
+    Args:
+        jobs (iterable): (month, year, temp, rain) tuples, one per frame.
+        output_path (str): Path of the GIF to write.
+        size (int): Frame width and height in pixels.
+        fps (float): Frames per second.
+        workers (int): Number of render processes. Defaults to the CPU count.
+        max_in_flight (int): Frames rendered ahead of the writer. Defaults to twice the worker count.
+
+    Returns:
+        int: Number of frames written.
+    """
+    workers = workers or os.cpu_count() or 1
+    duration = int(round(1000 / fps))
+    frames = 0
+    partial_path = art_generator.partial_path_for(output_path)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor, open(partial_path, "wb") as f:
+            f.write(gif_header(size))
+            args = ((job, size, duration) for job in jobs)
+            for frame in ordered_results(executor, encode_gif_frame, args, max_in_flight or workers * 2):
+                f.write(frame)
+                frames += 1
+                if frames % 12 == 0:
+                    print(f"{frames} frames written")
+            f.write(b";")
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, output_path)
+    return frames
+
+
+def export_frames(jobs, frames_dir, size=600, workers=None, max_in_flight=None):
+    """
+    Render frames in parallel as a numbered PNG sequence.
+
+    Files are named frame_00001.png, frame_00002.png, ... so they can be fed to
+    a video encoder, e.g. ffmpeg -framerate 8 -i frame_%05d.png climate.mp4.
+
+    Args:
+        jobs (iterable): (month, year, temp, rain) tuples, one per frame.
+        frames_dir (str): Directory to write the frames to.
+        size (int): Frame width and height in pixels.
+        workers (int): Number of render processes. Defaults to the CPU count.
+        max_in_flight (int): Frames rendered ahead of the writer. Defaults to twice the worker count.
+
+    Returns:
+        int: Number of frames written.
+    """
+    os.makedirs(frames_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    args = (
+        (job, size, os.path.join(frames_dir, f"frame_{number:05d}.png"))
+        for number, job in enumerate(jobs, 1)
+    )
+    frames = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _ in ordered_results(executor, save_png_frame, args, max_in_flight or workers * 2):
+            frames += 1
+            if frames % 12 == 0:
+                print(f"{frames} frames written")
+    return frames
+
+
+def main(argv=None):
+    """Command line entry point for time-lapse export."""
+    parser = argparse.ArgumentParser(description="Export a time-lapse animation of the monthly artwork.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--start", type=int, help="First year (default: first year in the data).")
+    parser.add_argument("--end", type=int, help="Last year (default: last year in the data).")
+    parser.add_argument("--output", default="climate.gif", help="GIF file to write.")
+    parser.add_argument("--frames-dir", help="Write a numbered PNG sequence to this directory instead of a GIF.")
+    parser.add_argument("--size", type=int, default=600, help="Frame width and height in pixels.")
+    parser.add_argument("--fps", type=float, default=8, help="Frames per second of the GIF.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of render processes (default: CPU count).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    index = data_processor.build_weather_index(data_processor.load_table(args.data))
+    if index is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+
+    start = args.start if args.start is not None else index.first_year
+    end = args.end if args.end is not None else index.last_year
+    jobs = iter_frame_jobs(index, start, end)
+
+    if args.frames_dir:
+        frames = export_frames(jobs, args.frames_dir, size=args.size, workers=args.workers)
+        print(f"Wrote {frames} frames to {args.frames_dir}")
+    else:
+        frames = export_gif(jobs, args.output, size=args.size, fps=args.fps, workers=args.workers)
+        print(f"Wrote {frames} frames to {args.output}")
+    return 0 if frames else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,292 +1,852 @@
+import io
 import os
 import random
 import math
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFilter, ImageEnhance, ImageFont
 import colorsys
+import numpy as np
 
-def generate_art(temp, rain):
+import batched_shapes
+import instrumentation
+
+DEFAULT_SIZE = (1200, 1200)
+
+# Preview renders are small, with fewer shapes, no rain particles and no texture
+PREVIEW_SIZE = (256, 256)
+PREVIEW_DENSITY = 0.75
+
+# Labels are left off renders too small for the text to be readable
+MIN_LABEL_FONT_SIZE = 8
+
+
+def background_color(temp):
     """
-    Generates abstract artwork based on temperature and rainfall influence.
+    Get the background color for a temperature.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+
+    Returns:
+        tuple: RGB color.
+    """
+    # General background color based on overall temperature feel
+    base_color = (255, 255, 255) # Default white
+    if temp < 10:
+        base_color = (220, 230, 240) # Very light blue for cold
+    elif 10 <= temp < 20:
+        base_color = (230, 240, 250) # Light blue
+    elif 20 <= temp < 25:
+        base_color = (240, 250, 230) # Light greenish-yellow
+    elif 25 <= temp < 30:
+        base_color = (250, 240, 220) # Light yellowish-orange
+    else: # temp >= 30
+        base_color = (250, 220, 200) # Light orange
+
+    return base_color
+
+
+def shape_counts(temp, rain, density=1.0, particles=True):
+    """
+    Get how many shapes and rain particles to draw for the given weather.
+
+    Both draw_shapes and batched_shapes take their counts from here. Rain adds
+    shapes in every band, and rain particles once rain is significant for the band.
 
     Args:
         temp (float): The average temperature in Celsius.
         rain (float): The average rainfall in mm.
+        density (float): Multiplier applied to the counts, see draw_shapes.
+        particles (bool): Whether rain particles are drawn.
 
     Returns:
-        str: The path to the saved artwork ("artwork.png") if successful, None otherwise.
+        tuple: (number of shapes, number of rain particles).
     """
-    if temp is None or rain is None:
-        print("Error: Temperature or rainfall data is missing.")
-        return None
+    if temp < 20:
+        shapes, rain_particles = (2000 + temp * 50 + rain * 10), 0
+    elif temp < 25:
+        shapes, rain_particles = (1500 + (temp - 20) * 100 + rain * 8), rain * 20 if rain > 10 else 0
+    elif temp < 30:
+        shapes, rain_particles = (1000 + (temp - 25) * 80 + rain * 5), rain * 15 if rain > 15 else 0
+    elif temp < 40:
+        shapes, rain_particles = (800 + (temp - 30) * 70 + rain * 4), rain * 10 if rain > 20 else 0
+    else:
+        shapes, rain_particles = 0, 0
+    return int(shapes * density), int(rain_particles * density) if particles else 0
+
+
+def draw_shapes(draw, rng, temp, rain, width, height, density=1.0, particles=True):
+    """
+    Draw the shapes and rain particles for the temperature band of temp.
 
-    try:
-        print(f"Generating artwork for temperature: {temp}°C, rainfall: {rain}mm")
+    Args:
+        draw (PIL.ImageDraw.ImageDraw): Drawing context of the image.
+        rng (random.Random): Random generator for all shape parameters.
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        width (int): Image width.
+        height (int): Image height.
+        density (float): Multiplier for the number of shapes and particles, used to keep
+            the same shapes per area on canvases that are not square.
+        particles (bool): Draw rain particles.
+    """
+    num_shapes, num_rain_particles = shape_counts(temp, rain, density, particles)
+    if temp < 20:
+        # Light blue/white hexagons and tiny circle shapes
+        for _ in range(num_shapes):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(5, max(5, int(30 - temp + rain * 0.1))) # Size influenced by temp and rain
+            color = rng.choice([(200, 220, 255, 200), (255, 255, 255, 200)]) # Light blue or white
+
+            shape_type = rng.choice(['hexagon', 'circle'])
+            if shape_type == 'hexagon':
+                points = []
+                for i in range(6):
+                    angle = i * (math.pi / 3)
+                    px = x + size * math.cos(angle)
+                    py = y + size * math.sin(angle)
+                    points.append((px, py))
+                draw.polygon(points, fill=color)
+            else: # circle
+                 circle_size = rng.randint(1, max(1, int(5 - rain * 0.05))) # Tiny circles, smaller with more rain
+                 x0, y0 = x - circle_size, y - circle_size
+                 x1, y1 = x + circle_size, y + circle_size
+                 if x0 > x1: x0, x1 = x1, x0
+                 if y0 > y1: y0, y1 = y1, y0
+                 draw.ellipse((x0, y0, x1, y1), fill=color)
+
+    elif 20 <= temp < 25:
+        # Darker blue, less white. Flower and grass-like shapes.
+        for _ in range(num_shapes):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(10, max(10, int(50 + (temp - 20) * 5 + rain * 0.1)))
+            # Darker blue, less white
+            blue_shade = rng.randint(100, max(100, int(180 - rain * 0.5))) # Blue shade influenced by rain
+            color = rng.choice([(50, 80, blue_shade, 220), (220, 220, 220, int(220 * (1 - rain * 0.01)))]) # Darker blue or less opaque white with rain
+
+            shape_type = rng.choice(['flower', 'grass'])
+            if shape_type == 'flower':
+                flower_size = rng.randint(size // 2, size)
+                num_petals = rng.randint(5, 8)
+                petal_color = (rng.randint(100, 200), rng.randint(50, 150), rng.randint(150, 250), 220) # Purplish/pinkish petals
+                center_color = (max(0, petal_color[0]-50), max(0, petal_color[1]-50), max(0, petal_color[2]-50), 220)
+                draw.ellipse((x-flower_size//4, y-flower_size//4, x+flower_size//4, y+flower_size//4), fill=center_color)
+                for i in range(num_petals):
+                    angle = i * (2 * math.pi / num_petals)
+                    petal_x = x + flower_size * math.cos(angle)
+                    petal_y = y + flower_size * math.sin(angle)
+                    x0_petal = min(x - flower_size//6, petal_x)
+                    y0_petal = min(y - flower_size//6, petal_y)
+                    x1_petal = max(x - flower_size//6, petal_x)
+                    y1_petal = max(y - flower_size//6, petal_y)
+                    draw.ellipse((x0_petal, y0_petal, x1_petal, y1_petal), fill=petal_color)
+            else: # grass
+                grass_height = rng.randint(size, size * 2)
+                grass_color = (rng.randint(80, 150), rng.randint(180, 255), rng.randint(80, 150), 220) # Greenish
+                curve = rng.randint(-size//2, size//2)
+                mid_x = x + curve
+                draw.line([(x, y), (mid_x, y - grass_height // 2), (x, y - grass_height)], fill=grass_color, width=rng.randint(1, 3))
+
+        # Add rain particles if rain is significant
+        for _ in range(num_rain_particles):
+            px = rng.randint(0, width)
+            py = rng.randint(0, height)
+            particle_size = rng.randint(1, 3)
+            particle_color = (100, 150, 200, rng.randint(100, 200)) # Blueish rain particle
+            draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
+
+
+    elif 25 <= temp < 30:
+        # Mix of blue and yellow colored triangle and rectangle shapes.
+        # Shapes like rivers sometimes with green tree leaves around.
+        # If rain was significant that month than some rain particles will be on top of the temp shapes.
+        for _ in range(num_shapes):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(20, max(20, int(80 + (temp - 25) * 4 + rain * 0.1)))
+            color = rng.choice([(50, 100, 200, 220), (255, 220, 80, 220)]) # Blue or yellow
+
+            shape_type = rng.choice(['triangle', 'rectangle', 'river', 'leaf'])
+
+            if shape_type == 'triangle':
+                points = []
+                for i in range(3):
+                    angle = i * (2 * math.pi / 3) + rng.uniform(-0.5, 0.5)
+                    px = x + size * rng.uniform(1, 2) * math.cos(angle)
+                    py = y + size * rng.uniform(1, 2) * math.sin(angle)
+                    points.append((px, py))
+                draw.polygon(points, fill=color)
+            elif shape_type == 'rectangle':
+                rect_width = rng.randint(size // 2, size)
+                rect_height = rng.randint(size // 2, size)
+                x0, y0 = x, y
+                x1, y1 = x + rect_width, y + rect_height
+                if x0 > x1: x0, x1 = x1, x0
+                if y0 > y1: y0, y1 = y1, y0
+                draw.rectangle((x0, y0, x1, y1), fill=color)
+            elif shape_type == 'river':
+                 river_width = rng.randint(size // 4, size // 2)
+                 river_length = rng.randint(size * 2, size * 5)
+                 angle = rng.uniform(0, 2 * math.pi)
+                 ex = x + int(river_length * math.cos(angle))
+                 ey = y + int(river_length * math.sin(angle))
+                 river_color = (50, 150, 200, 220) # Blueish for river
+                 draw.line((x, y, ex, ey), fill=river_color, width=river_width, joint="curve") # Use curve joint for smoother river
+            else: # leaf
+                 leaf_size = rng.randint(size // 4, size // 2)
+                 leaf_color = (50, rng.randint(150, 220), 50, 220) # Greenish for leaves
+                 x0_leaf, y0_leaf = x - leaf_size, y - leaf_size
+                 x1_leaf, y1_leaf = x + leaf_size, y + leaf_size
+                 if x0_leaf > x1_leaf: x0_leaf, x1_leaf = x1_leaf, x0_leaf
+                 if y0_leaf > y1_leaf: y0_leaf, y1_leaf = y1_leaf, y0_leaf
+                 draw.ellipse((x0_leaf, y0_leaf, x1_leaf, y1_leaf), fill=leaf_color)
+
+        # Add rain particles if rain is significant
+        for _ in range(num_rain_particles):
+            px = rng.randint(0, width)
+            py = rng.randint(0, height)
+            particle_size = rng.randint(1, 4)
+            particle_color = (120, 160, 210, rng.randint(120, 220)) # Slightly lighter blue rain particle
+            draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
+
+
+    elif 30 <= temp < 40:
+        # Orange and red with square shapes and some spikey shapes around.
+        # If rain was significant then grayish combined with red-orange colors. Red spikes. Yellow thunder shapes.
+        significant_rain_threshold = 20 # Define what significant rain means in this range
+        has_significant_rain = rain > significant_rain_threshold
+
+        for _ in range(num_shapes):
+            x = rng.randint(0, width)
+            y = rng.randint(0, height)
+            size = rng.randint(25, max(25, int(100 + (temp - 30) * 5 + rain * 0.1)))
 
-        # Create a new image
-        width, height = 1200, 1200
-        img = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(img)
-
-        # Add a general background color based on overall temperature feel
-        base_color = (255, 255, 255) # Default white
-        if temp < 10:
-            base_color = (220, 230, 240) # Very light blue for cold
-        elif 10 <= temp < 20:
-            base_color = (230, 240, 250) # Light blue
-        elif 20 <= temp < 25:
-            base_color = (240, 250, 230) # Light greenish-yellow
-        elif 25 <= temp < 30:
-            base_color = (250, 240, 220) # Light yellowish-orange
-        else: # temp >= 30
-            base_color = (250, 220, 200) # Light orange
-
-        draw.rectangle([0, 0, width, height], fill=base_color) # Draw background first
-
-        # --- Draw shapes and elements based on temperature and rain ---
-
-        if temp < 20:
-            # Light blue/white hexagons and tiny circle shapes
-            num_shapes = int(2000 + temp * 50 + rain * 10) # Influence number by rain too
-            for _ in range(num_shapes):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(5, max(5, int(30 - temp + rain * 0.1))) # Size influenced by temp and rain
-                color = random.choice([(200, 220, 255, 200), (255, 255, 255, 200)]) # Light blue or white
-
-                shape_type = random.choice(['hexagon', 'circle'])
-                if shape_type == 'hexagon':
-                    points = []
-                    for i in range(6):
-                        angle = i * (math.pi / 3)
-                        px = x + size * math.cos(angle)
-                        py = y + size * math.sin(angle)
-                        points.append((px, py))
-                    draw.polygon(points, fill=color)
-                else: # circle
-                     circle_size = random.randint(1, max(1, int(5 - rain * 0.05))) # Tiny circles, smaller with more rain
-                     x0, y0 = x - circle_size, y - circle_size
-                     x1, y1 = x + circle_size, y + circle_size
-                     if x0 > x1: x0, x1 = x1, x0
-                     if y0 > y1: y0, y1 = y1, y0
-                     draw.ellipse((x0, y0, x1, y1), fill=color)
-
-        elif 20 <= temp < 25:
-            # Darker blue, less white. Flower and grass-like shapes.
-            num_shapes = int(1500 + (temp - 20) * 100 + rain * 8)
-            for _ in range(num_shapes):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(10, max(10, int(50 + (temp - 20) * 5 + rain * 0.1)))
-                # Darker blue, less white
-                blue_shade = random.randint(100, max(100, int(180 - rain * 0.5))) # Blue shade influenced by rain
-                color = random.choice([(50, 80, blue_shade, 220), (220, 220, 220, int(220 * (1 - rain * 0.01)))]) # Darker blue or less opaque white with rain
-
-                shape_type = random.choice(['flower', 'grass'])
-                if shape_type == 'flower':
-                    flower_size = random.randint(size // 2, size)
-                    num_petals = random.randint(5, 8)
-                    petal_color = (random.randint(100, 200), random.randint(50, 150), random.randint(150, 250), 220) # Purplish/pinkish petals
-                    center_color = (max(0, petal_color[0]-50), max(0, petal_color[1]-50), max(0, petal_color[2]-50), 220)
-                    draw.ellipse((x-flower_size//4, y-flower_size//4, x+flower_size//4, y+flower_size//4), fill=center_color)
-                    for i in range(num_petals):
-                        angle = i * (2 * math.pi / num_petals)
-                        petal_x = x + flower_size * math.cos(angle)
-                        petal_y = y + flower_size * math.sin(angle)
-                        x0_petal = min(x - flower_size//6, petal_x)
-                        y0_petal = min(y - flower_size//6, petal_y)
-                        x1_petal = max(x - flower_size//6, petal_x)
-                        y1_petal = max(y - flower_size//6, petal_y)
-                        draw.ellipse((x0_petal, y0_petal, x1_petal, y1_petal), fill=petal_color)
-                else: # grass
-                    grass_height = random.randint(size, size * 2)
-                    grass_color = (random.randint(80, 150), random.randint(180, 255), random.randint(80, 150), 220) # Greenish
-                    curve = random.randint(-size//2, size//2)
-                    mid_x = x + curve
-                    draw.line([(x, y), (mid_x, y - grass_height // 2), (x, y - grass_height)], fill=grass_color, width=random.randint(1, 3))
-
-            # Add rain particles if rain is significant
-            significant_rain_threshold = 10
-            if rain > significant_rain_threshold:
-                 num_rain_particles = int(rain * 20)
-                 for _ in range(num_rain_particles):
-                      px = random.randint(0, width)
-                      py = random.randint(0, height)
-                      particle_size = random.randint(1, 3)
-                      particle_color = (100, 150, 200, random.randint(100, 200)) # Blueish rain particle
-                      draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
-
-
-        elif 25 <= temp < 30:
-            # Mix of blue and yellow colored triangle and rectangle shapes.
-            # Shapes like rivers sometimes with green tree leaves around.
-            # If rain was significant that month than some rain particles will be on top of the temp shapes.
-            num_shapes = int(1000 + (temp - 25) * 80 + rain * 5)
-            significant_rain_threshold = 15 # Define what significant rain means in this range
-            has_significant_rain = rain > significant_rain_threshold
-
-            for _ in range(num_shapes):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(20, max(20, int(80 + (temp - 25) * 4 + rain * 0.1)))
-                color = random.choice([(50, 100, 200, 220), (255, 220, 80, 220)]) # Blue or yellow
-
-                shape_type = random.choice(['triangle', 'rectangle', 'river', 'leaf'])
-
-                if shape_type == 'triangle':
-                    points = []
-                    for i in range(3):
-                        angle = i * (2 * math.pi / 3) + random.uniform(-0.5, 0.5)
-                        px = x + size * random.uniform(1, 2) * math.cos(angle)
-                        py = y + size * random.uniform(1, 2) * math.sin(angle)
-                        points.append((px, py))
-                    draw.polygon(points, fill=color)
-                elif shape_type == 'rectangle':
-                    rect_width = random.randint(size // 2, size)
-                    rect_height = random.randint(size // 2, size)
-                    x0, y0 = x, y
-                    x1, y1 = x + rect_width, y + rect_height
-                    if x0 > x1: x0, x1 = x1, x0
-                    if y0 > y1: y0, y1 = y1, y0
-                    draw.rectangle((x0, y0, x1, y1), fill=color)
-                elif shape_type == 'river':
-                     river_width = random.randint(size // 4, size // 2)
-                     river_length = random.randint(size * 2, size * 5)
-                     angle = random.uniform(0, 2 * math.pi)
-                     ex = x + int(river_length * math.cos(angle))
-                     ey = y + int(river_length * math.sin(angle))
-                     river_color = (50, 150, 200, 220) # Blueish for river
-                     draw.line((x, y, ex, ey), fill=river_color, width=river_width, joint="curve") # Use curve joint for smoother river
-                else: # leaf
-                     leaf_size = random.randint(size // 4, size // 2)
-                     leaf_color = (50, random.randint(150, 220), 50, 220) # Greenish for leaves
-                     x0_leaf, y0_leaf = x - leaf_size, y - leaf_size
-                     x1_leaf, y1_leaf = x + leaf_size, y + leaf_size
-                     if x0_leaf > x1_leaf: x0_leaf, x1_leaf = x1_leaf, x0_leaf
-                     if y0_leaf > y1_leaf: y0_leaf, y1_leaf = y1_leaf, y0_leaf
-                     draw.ellipse((x0_leaf, y0_leaf, x1_leaf, y1_leaf), fill=leaf_color)
-
-            # Add rain particles if rain is significant
-            if has_significant_rain:
-                 num_rain_particles = int(rain * 15)
-                 for _ in range(num_rain_particles):
-                      px = random.randint(0, width)
-                      py = random.randint(0, height)
-                      particle_size = random.randint(1, 4)
-                      particle_color = (120, 160, 210, random.randint(120, 220)) # Slightly lighter blue rain particle
-                      draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
-
-
-        elif 30 <= temp < 40:
-            # Orange and red with square shapes and some spikey shapes around.
-            # If rain was significant then grayish combined with red-orange colors. Red spikes. Yellow thunder shapes.
-            num_shapes = int(800 + (temp - 30) * 70 + rain * 4)
-            significant_rain_threshold = 20 # Define what significant rain means in this range
-            has_significant_rain = rain > significant_rain_threshold
-
-            for _ in range(num_shapes):
-                x = random.randint(0, width)
-                y = random.randint(0, height)
-                size = random.randint(25, max(25, int(100 + (temp - 30) * 5 + rain * 0.1)))
-
-                if has_significant_rain:
-                    # Grayish combined with red-orange
-                    r = random.randint(180, 220)
-                    g = random.randint(80, 120)
-                    b = random.randint(60, 100)
-                    gray_blend = random.uniform(0.3, min(0.6, rain * 0.001)) # How much to blend with gray, more with more rain
-                    color = (
-                        int(r * (1 - gray_blend) + 150 * gray_blend),
-                        int(g * (1 - gray_blend) + 150 * gray_blend),
-                        int(b * (1 - gray_blend) + 150 * gray_blend),
-                        220
-                    )
-                else:
-                    # Orange and red
-                    color = random.choice([(255, random.randint(100, 160), 0, 220), (random.randint(200, 255), 0, 0, 220)])
-
-
-                shape_type = random.choice(['square', 'spikey', 'thunder'] if has_significant_rain else ['square', 'spikey'])
-
-                if shape_type == 'square':
-                    square_size = random.randint(size // 2, size)
-                    x0, y0 = x, y
-                    x1, y1 = x + square_size, y + square_size
-                    if x0 > x1: x0, x1 = x1, x0
-                    if y0 > y1: y0, y1 = y1, y0
-                    draw.rectangle((x0, y0, x1, y1), fill=color)
-                elif shape_type == 'spikey':
-                     spike_length = random.randint(size // 2, size)
-                     spike_width = random.randint(1, 5)
-                     angle = random.uniform(0, 2 * math.pi)
-                     ex = x + int(spike_length * math.cos(angle))
-                     ey = y + int(spike_length * math.sin(angle))
-                     spike_color = (255, 0, 0, 220) if has_significant_rain else color # Red spikes if significant rain
-                     draw.line((x, y, ex, ey), fill=spike_color, width=spike_width)
-                elif shape_type == 'thunder':
-                     thunder_size = random.randint(size, size * 2)
-                     thunder_color = (255, 255, 0, 220) # Yellow thunder
-                     # Draw a simplified zig-zag thunder shape
-                     points = [
-                         (x, y),
-                         (x + thunder_size // 3, y + thunder_size // 2),
-                         (x, y + thunder_size),
-                         (x + thunder_size // 2, y + thunder_size // 2),
-                         (x + thunder_size, y)
-                     ]
-                     draw.line(points, fill=thunder_color, width=random.randint(2, 5))
-
-            # Add rain particles if rain is significant
             if has_significant_rain:
-                 num_rain_particles = int(rain * 10)
-                 for _ in range(num_rain_particles):
-                      px = random.randint(0, width)
-                      py = random.randint(0, height)
-                      particle_size = random.randint(1, 5)
-                      particle_color = (150, 150, 150, random.randint(150, 250)) # Grayish rain particle
-                      draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
+                # Grayish combined with red-orange
+                r = rng.randint(180, 220)
+                g = rng.randint(80, 120)
+                b = rng.randint(60, 100)
+                gray_blend = rng.uniform(0.3, min(0.6, rain * 0.001)) # How much to blend with gray, more with more rain
+                color = (
+                    int(r * (1 - gray_blend) + 150 * gray_blend),
+                    int(g * (1 - gray_blend) + 150 * gray_blend),
+                    int(b * (1 - gray_blend) + 150 * gray_blend),
+                    220
+                )
+            else:
+                # Orange and red
+                color = rng.choice([(255, rng.randint(100, 160), 0, 220), (rng.randint(200, 255), 0, 0, 220)])
+
+
+            shape_type = rng.choice(['square', 'spikey', 'thunder'] if has_significant_rain else ['square', 'spikey'])
+
+            if shape_type == 'square':
+                square_size = rng.randint(size // 2, size)
+                x0, y0 = x, y
+                x1, y1 = x + square_size, y + square_size
+                if x0 > x1: x0, x1 = x1, x0
+                if y0 > y1: y0, y1 = y1, y0
+                draw.rectangle((x0, y0, x1, y1), fill=color)
+            elif shape_type == 'spikey':
+                 spike_length = rng.randint(size // 2, size)
+                 spike_width = rng.randint(1, 5)
+                 angle = rng.uniform(0, 2 * math.pi)
+                 ex = x + int(spike_length * math.cos(angle))
+                 ey = y + int(spike_length * math.sin(angle))
+                 spike_color = (255, 0, 0, 220) if has_significant_rain else color # Red spikes if significant rain
+                 draw.line((x, y, ex, ey), fill=spike_color, width=spike_width)
+            elif shape_type == 'thunder':
+                 thunder_size = rng.randint(size, size * 2)
+                 thunder_color = (255, 255, 0, 220) # Yellow thunder
+                 # Draw a simplified zig-zag thunder shape
+                 points = [
+                     (x, y),
+                     (x + thunder_size // 3, y + thunder_size // 2),
+                     (x, y + thunder_size),
+                     (x + thunder_size // 2, y + thunder_size // 2),
+                     (x + thunder_size, y)
+                 ]
+                 draw.line(points, fill=thunder_color, width=rng.randint(2, 5))
+
+        # Add rain particles if rain is significant
+        for _ in range(num_rain_particles):
+            px = rng.randint(0, width)
+            py = rng.randint(0, height)
+            particle_size = rng.randint(1, 5)
+            particle_color = (150, 150, 150, rng.randint(150, 250)) # Grayish rain particle
+            draw.ellipse((px-particle_size, py-particle_size, px+particle_size, py+particle_size), fill=particle_color)
+
+
+class ScaledDraw:
+    """
+    ImageDraw wrapper that draws shapes laid out for a DEFAULT_SIZE canvas onto a canvas of another size.
+
+    The shape code works with absolute pixel sizes tuned for 1200px artwork.
+    Coordinates and line widths are multiplied by scale on the way through,
+    so the same code renders thumbnails and print-size output. An origin
+    shifts the result, for drawing one tile of a larger image.
+    """
+
+    def __init__(self, draw, scale, origin=(0, 0)):
+        """
+        Args:
+            draw (PIL.ImageDraw.ImageDraw): Drawing context of the real canvas.
+            scale (float): Real pixels per reference pixel.
+            origin (tuple): Real pixel position of the canvas's top left corner in the full image.
+        """
+        self.draw = draw
+        self.scale = scale
+        self.origin = origin
+
+    def _xy(self, xy):
+        """Scale a flat coordinate sequence or a sequence of (x, y) points."""
+        s = self.scale
+        ox, oy = self.origin
+        if isinstance(xy[0], (tuple, list)):
+            return [(x * s - ox, y * s - oy) for x, y in xy]
+        if not ox and not oy:
+            return [v * s for v in xy]
+        return [v * s - (oy if i % 2 else ox) for i, v in enumerate(xy)]
+
+    def ellipse(self, xy, **kwargs):
+        self.draw.ellipse(self._xy(xy), **kwargs)
+
+    def rectangle(self, xy, **kwargs):
+        self.draw.rectangle(self._xy(xy), **kwargs)
+
+    def polygon(self, xy, **kwargs):
+        self.draw.polygon(self._xy(xy), **kwargs)
+
+    def line(self, xy, width=0, **kwargs):
+        self.draw.line(self._xy(xy), width=max(1, round(width * self.scale)), **kwargs)
+
+
+def reference_canvas(size):
+    """
+    Get the canvas the shape code lays shapes out on for an image size.
 
+    The shorter side maps to the 1200px reference, and the longer side grows
+    with the aspect ratio so wide or tall images get proportionally more shapes.
+
+    Args:
+        size (tuple): (width, height) of the image.
+
+    Returns:
+        tuple: (scale, width, height, density) where width and height are in
+        reference pixels and density is the shape count multiplier.
+    """
+    width, height = size
+    scale = min(width, height) / min(DEFAULT_SIZE)
+    ref_width, ref_height = round(width / scale), round(height / scale)
+    density = (ref_width * ref_height) / (DEFAULT_SIZE[0] * DEFAULT_SIZE[1])
+    return scale, ref_width, ref_height, density
 
-        # Add a subtle texture overlay (optional, can be adjusted)
-        # Ensure this is drawn *after* the main shapes
-        add_texture(img, temp, rain)
 
+def draw_label(img, temp, rain, scale=1.0, origin=(0, 0)):
+    """
+    Draw the temperature and rainfall info label in the top left corner.
 
-        # Add info label
-        draw = ImageDraw.Draw(img)
+    origin is the position of img in the full artwork when img is one tile of it.
+    """
+    text = f"Temp: {temp:.1f}°C, Rain: {rain:.1f}mm"
+    draw = ImageDraw.Draw(img, 'RGBA')
+    ox, oy = origin
+    if scale == 1.0:
         # Ensure the info label rectangle coordinates are ordered correctly
         x0_label, y0_label, x1_label, y1_label = 5, 5, 250, 30
         if x0_label > x1_label: x0_label, x1_label = x1_label, x0_label
         if y0_label > y1_label: y0_label, y1_label = y1_label, y0_label
-        draw.rectangle([x0_label, y0_label, x1_label, y1_label], fill=(0, 0, 0, 180))
-        draw.text((10, 10), f"Temp: {temp:.1f}°C, Rain: {rain:.1f}mm", fill=(255, 255, 255))
+        draw.rectangle([x0_label - ox, y0_label - oy, x1_label - ox, y1_label - oy], fill=(0, 0, 0, 180))
+        draw.text((10 - ox, 10 - oy), text, fill=(255, 255, 255))
+        return
+
+    font_size = 11 * scale
+    if font_size < MIN_LABEL_FONT_SIZE:
+        return
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        font = ImageFont.load_default()  # Pillow < 10.1 only has the fixed-size bitmap font
+    margin = round(5 * scale)
+    position = (2 * margin - ox, 2 * margin - oy)
+    _, _, x1, y1 = draw.textbbox(position, text, font=font)
+    draw.rectangle([margin - ox, margin - oy, x1 + margin, y1 + margin], fill=(0, 0, 0, 180))
+    draw.text(position, text, fill=(255, 255, 255), font=font)
+
+
+def render_art(temp, rain, reuse_texture=False, seed=None, batched=True, recorder=None,
+               size=None, preview=False):
+    """
+    Render abstract artwork based on temperature and rainfall influence, without saving it.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        reuse_texture (bool): Reuse a pooled texture for the temperature band
+            instead of generating a new one.
+        seed (int): Seed for the random generator. The same inputs and seed always
+            produce identical artwork. A random seed is used if omitted.
+        batched (bool): Generate each band's shape parameters as NumPy arrays up front
+            (see batched_shapes) instead of drawing random values shape by shape, which
+            is faster in every temperature band. Both paths draw the same number of shapes.
+        recorder (instrumentation.StageRecorder): Records the duration of each render stage.
+            Instrumentation is off if omitted.
+        size (tuple): (width, height) of the artwork. Shape sizes, line widths and
+            shape counts scale with it, so every size shows the same composition.
+            Defaults to DEFAULT_SIZE, or PREVIEW_SIZE in preview mode.
+        preview (bool): Render a quick thumbnail: PREVIEW_DENSITY of the shapes,
+            no rain particles and no texture.
+
+    Returns:
+        PIL.Image.Image: The rendered RGB image.
+    """
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+    rng = random.Random(seed)
+
+    # Create a new image
+    if size is None:
+        size = PREVIEW_SIZE if preview else DEFAULT_SIZE
+    width, height = size
+    scale, ref_width, ref_height, density = reference_canvas(size)
+    if preview:
+        density *= PREVIEW_DENSITY
+    with recorder.stage("background", bytes=width * height * 3):
+        # The one full-size buffer of the render, filled with a general background
+        # color based on overall temperature feel
+        img = Image.new('RGB', (width, height), background_color(temp))
+        # RGBA drawing mode blends fills like (200, 220, 255, 200) by their alpha
+        # straight into the RGB image, without an RGBA copy to composite
+        draw = ImageDraw.Draw(img, 'RGBA')
+
+    # --- Draw shapes and elements based on temperature and rain ---
+
+    # Shapes are laid out on the reference canvas and scaled onto the real one
+    if scale != 1.0:
+        draw = ScaledDraw(draw, scale)
+    particles = not preview
+    num_shapes, num_particles = shape_counts(temp, rain, density, particles)
+    with recorder.stage("shapes", batched=batched, shapes=num_shapes, particles=num_particles):
+        if batched:
+            # Same shapes, with all parameters generated up front as NumPy arrays
+            batched_shapes.draw_band_shapes(
+                draw, np.random.default_rng(rng.getrandbits(64)), temp, rain, ref_width, ref_height, density, particles
+            )
+        else:
+            draw_shapes(draw, rng, temp, rain, ref_width, ref_height, density, particles)
+
+    # Add a subtle texture overlay (optional, can be adjusted)
+    # Ensure this is drawn *after* the main shapes
+    if not preview:
+        with recorder.stage("texture", reused=reuse_texture):
+            add_texture(img, temp, rain, reuse_texture=reuse_texture, rng=rng)
+
+    # Add info label
+    with recorder.stage("label"):
+        draw_label(img, temp, rain, scale)
+
+    return img
+
+
+def image_to_array(img):
+    """
+    Get the raw pixel buffer of a rendered image.
+
+    Args:
+        img (PIL.Image.Image): The rendered image.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape [height, width, 3].
+    """
+    return np.asarray(img)
+
+
+def format_for_path(output_path):
+    """Get the Pillow format name for a path's extension, falling back to "PNG"."""
+    ext = os.path.splitext(output_path)[1].lower() if isinstance(output_path, str) else ""
+    return Image.registered_extensions().get(ext, "PNG")
+
+
+# Highest compress_level per format: the PNG zlib level and the WebP encoder effort
+COMPRESS_LEVEL_RANGES = {"PNG": 9, "WEBP": 6}
+
+
+def encoder_options(image_format, compress_level=None, quality=None, optimize=False):
+    """
+    Build the Pillow save options for an output format.
+
+    Options that do not apply to the format are left out, and options left
+    as None keep Pillow's defaults. For the noisy 1200px artwork, PNG level 1
+    encodes about a third faster than the default level 6 for a file about
+    15% larger, while optimize or level 9 are roughly ten times slower for a
+    few percent. JPEG and WebP are lossy but several times smaller.
+
+    Args:
+        image_format (str): Pillow format name, e.g. "PNG", "JPEG" or "WEBP".
+        compress_level (int): PNG zlib level from 0 (fastest) to 9 (smallest), Pillow's
+            default is 6. For WebP, the encoder effort from 0 (fastest) to 6, default 4.
+        quality (int): JPEG and WebP quality from 0 to 100.
+        optimize (bool): Spend extra time on a smaller PNG or JPEG file.
+
+    Returns:
+        dict: Keyword arguments for PIL.Image.Image.save.
+
+    Raises:
+        ValueError: If compress_level or quality is out of range for the format.
+    """
+    max_level = COMPRESS_LEVEL_RANGES.get(image_format)
+    if compress_level is not None and max_level is not None and not 0 <= compress_level <= max_level:
+        raise ValueError(f"{image_format} compress level must be between 0 and {max_level}, got {compress_level}")
+    if quality is not None and not 0 <= quality <= 100:
+        raise ValueError(f"Quality must be between 0 and 100, got {quality}")
+    options = {}
+    if image_format == "PNG":
+        if compress_level is not None:
+            options["compress_level"] = compress_level
+        if optimize:
+            options["optimize"] = True
+    elif image_format == "WEBP":
+        if compress_level is not None:
+            options["method"] = compress_level
+        if quality is not None:
+            options["quality"] = quality
+    elif image_format == "JPEG":
+        if quality is not None:
+            options["quality"] = quality
+        if optimize:
+            options["optimize"] = True
+    return options
+
+
+def image_to_bytes(img, image_format="PNG", **options):
+    """
+    Encode a rendered image in memory.
+
+    Args:
+        img (PIL.Image.Image): The rendered image.
+        image_format (str): Pillow format name, e.g. "PNG", "JPEG" or "WEBP".
+        **options: Save options, see encoder_options.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
 
+def partial_path_for(path):
+    """
+    Get a temporary path to write a file to before moving it into place.
+
+    The name is unique to the calling process and thread, so concurrent
+    writers of the same output never share a half-written file.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}-{threading.get_ident()}.partial{ext}"
+
+
+def save_image(img, output_path, image_format=None, data=None, **options):
+    """
+    Save an image, moving it into place only once it is completely written.
+
+    Args:
+        img (PIL.Image.Image): The image to save.
+        output_path (str or file-like): Path or binary file to write to.
+        image_format (str): Pillow format name. Inferred from the output path if omitted.
+        data (bytes): The image already encoded in image_format, written as is if given.
+        **options: Save options, see encoder_options.
+    """
+    if image_format is None:
+        image_format = format_for_path(output_path)
+    if not isinstance(output_path, str):
+        if data is None:
+            img.save(output_path, format=image_format, **options)
+        else:
+            output_path.write(data)
+        return
+    partial_path = partial_path_for(output_path)
+    if data is None:
+        img.save(partial_path, format=image_format, **options)
+    else:
+        with open(partial_path, "wb") as f:
+            f.write(data)
+    os.replace(partial_path, output_path)
+
+
+def generate_art(temp, rain, output_path="artwork.png", reuse_texture=False, seed=None,
+                 image_format=None, returns="path", batched=True, recorder=None, size=None, preview=False,
+                 tile_size=None, tile_workers=None, compress_level=None, quality=None, optimize=False):
+    """
+    Generates abstract artwork based on temperature and rainfall influence.
+
+    All state lives in the call: the random generator is created from seed and
+    the file is written under a per-call temporary name, then moved to
+    output_path. Calls can run concurrently on threads, see generate_many.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        output_path (str or file-like): Where to save the artwork. Defaults to "artwork.png".
+            Pass None to skip encoding and saving entirely.
+        reuse_texture (bool): Reuse a pooled texture for the temperature band
+            instead of generating a new one.
+        seed (int): Seed for the random generator. The same inputs and seed always
+            produce identical artwork. A random seed is used if omitted.
+        image_format (str): Pillow format name used to encode the artwork. Inferred from
+            the output path if omitted, falling back to "PNG".
+        returns (str): What to return: "path" (the output path), "image" (the PIL image),
+            "array" (a NumPy pixel buffer) or "bytes" (the encoded image).
+        batched (bool): Use the batched shape generation path (see render_art).
+        recorder (instrumentation.StageRecorder): Records the duration of each render and
+            encode stage. Instrumentation is off if omitted.
+        size (tuple): (width, height) of the artwork, see render_art.
+        preview (bool): Render a quick low-resolution thumbnail, see render_art.
+        tile_size (int): Render in tiles of this many pixels and stream them into a PNG,
+            so memory stays bounded for print-size output (see tiled_render). Only
+            returns="path" is supported in this mode.
+        tile_workers (int): Number of processes tiles are rendered in. Tiles are
+            rendered in this process if omitted.
+        compress_level (int): PNG compression level or WebP effort, see encoder_options.
+        quality (int): JPEG or WebP quality, see encoder_options.
+        optimize (bool): Spend extra time on a smaller PNG or JPEG file.
+
+    Returns:
+        The artwork in the form selected by returns if successful, None otherwise.
+    """
+    if temp is None or rain is None:
+        print("Error: Temperature or rainfall data is missing.")
+        return None
 
-        # Save the image
-        img.save("artwork.png")
-        print("Artwork generated successfully: artwork.png")
-        return "artwork.png"
+    try:
+        print(f"Generating artwork for temperature: {temp}°C, rainfall: {rain}mm")
+        if recorder is None:
+            recorder = instrumentation.NULL_RECORDER
+        if image_format is None:
+            image_format = format_for_path(output_path)
+        options = encoder_options(image_format, compress_level, quality, optimize)
+
+        if tile_size is not None:
+            if returns != "path" or output_path is None or image_format != "PNG":
+                print("Error: Tiled rendering only writes PNG files and returns the output path.")
+                return None
+            import tiled_render  # Imported here, tiled_render builds on this module
+            tiled_render.render_tiled(
+                temp, rain, output_path, size or DEFAULT_SIZE, tile_size=tile_size, seed=seed, batched=batched,
+                workers=tile_workers, recorder=recorder,
+                compress_level=6 if compress_level is None else compress_level,
+            )
+            print(f"Artwork generated successfully: {output_path if isinstance(output_path, str) else 'file object'}")
+            return output_path
+
+        img = render_art(
+            temp, rain, reuse_texture=reuse_texture, seed=seed, batched=batched, recorder=recorder,
+            size=size, preview=preview,
+        )
+
+        data = None
+        if returns == "bytes":
+            with recorder.stage("encode", format=image_format) as record:
+                data = image_to_bytes(img, image_format, **options)
+                record["bytes"] = len(data)
+
+        if output_path is not None:
+            with recorder.stage("save", format=image_format) as record:
+                save_image(img, output_path, image_format, data, **options)
+                if recorder.enabled and isinstance(output_path, str):
+                    record["bytes"] = os.path.getsize(output_path)
+            print(f"Artwork generated successfully: {output_path if isinstance(output_path, str) else 'file object'}")
+
+        if returns == "image":
+            return img
+        elif returns == "array":
+            return image_to_array(img)
+        elif returns == "bytes":
+            return data
+        return output_path
 
     except Exception as e:
         print(f"Error generating artwork: {e}")
         return None
 
 
-def add_texture(img, temp, rain):
-    """Add texture overlay to the image for more artistic feel."""
-    # Create a texture layer
-    texture = Image.new('RGBA', img.size, (255, 255, 255, 0))
-    draw_texture = ImageDraw.Draw(texture)
+def generate_many(jobs, workers=None, **options):
+    """
+    Generate several artworks concurrently on a thread pool in this process.
+
+    Pillow releases the GIL while rasterizing and encoding, so threads
+    overlap much of the work without the start-up and pickling cost of a
+    process pool. Results keep the order of the jobs.
+
+    Args:
+        jobs (iterable): (temp, rain, output_path, seed) tuples. Output paths must be distinct.
+        workers (int): Number of threads. Defaults to the CPU count.
+        **options: Keyword arguments passed to every generate_art call, e.g. returns or size.
+
+    Returns:
+        list: The generate_art result of each job.
+
+    Raises:
+        ValueError: If two jobs write to the same path.
+    """
+    jobs = list(jobs)
+    paths = [job[2] for job in jobs if job[2] is not None]
+    if len(set(paths)) != len(paths):
+        raise ValueError("Every job needs its own output path")
+
+    def run(job):
+        temp, rain, output_path, seed = job
+        return generate_art(temp, rain, output_path=output_path, seed=seed, **options)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(executor.map(run, jobs))
+
+
+TEXTURE_POINTS = 50000
+TEXTURE_MAX_INTENSITY = 40
+TEXTURE_POOL_SIZE = 4
+
+# Precomputed textures keyed by (temperature band, image size). Filled under
+# the lock, read-only once built
+_texture_pool = {}
+_texture_pool_lock = threading.Lock()
+
+
+def temperature_band(temp):
+    """
+    Map a temperature to the index of its background color band.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+
+    Returns:
+        int: 0 (< 10), 1 (10-20), 2 (20-25), 3 (25-30) or 4 (>= 30).
+    """
+    if temp < 10:
+        return 0
+    elif temp < 20:
+        return 1
+    elif temp < 25:
+        return 2
+    elif temp < 30:
+        return 3
+    return 4
+
+
+def make_texture(size, rng=None):
+    """
+    Build the noise points used by add_texture.
+
+    Scatters TEXTURE_POINTS points per DEFAULT_SIZE area at random positions with
+    a random intensity between 0 and TEXTURE_MAX_INTENSITY. The points are kept
+    sorted by intensity so each intensity can be drawn in a single call.
+
+    Args:
+        size (tuple): (width, height) of the image the texture is for.
+        rng (numpy.random.Generator): Random generator to use. A fresh one is created if omitted.
+
+    Returns:
+        tuple: (xy, starts) where xy is an int array of [points, 2] positions and
+        starts[i]:starts[i + 1] is the slice of xy with intensity i.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    width, height = size
+    points = round(TEXTURE_POINTS * width * height / (DEFAULT_SIZE[0] * DEFAULT_SIZE[1]))
+    xy = np.stack(
+        [rng.integers(0, width, points, dtype=np.int32), rng.integers(0, height, points, dtype=np.int32)], axis=1
+    )
+    intensity = rng.integers(0, TEXTURE_MAX_INTENSITY + 1, points, dtype=np.uint8)
+    order = np.argsort(intensity, kind="stable")
+    starts = np.searchsorted(intensity[order], np.arange(TEXTURE_MAX_INTENSITY + 2))
+    return xy[order], starts
+
+
+def apply_texture(img, texture):
+    """
+    Blend texture points into an RGB image in place as white at their intensity.
+
+    Args:
+        img (PIL.Image.Image): The RGB image to texture.
+        texture (tuple): (xy, starts) from make_texture.
+    """
+    xy, starts = texture
+    draw = ImageDraw.Draw(img, 'RGBA')
+    # Intensity 0 leaves the pixel unchanged, so start at 1
+    for intensity in range(1, TEXTURE_MAX_INTENSITY + 1):
+        start, end = starts[intensity], starts[intensity + 1]
+        if end > start:
+            draw.point(xy[start:end].ravel().tolist(), fill=(255, 255, 255, intensity))
+
+
+def _pool_texture(band, size, slot):
+    """Build the texture for one pool slot, seeded by its slot so pools are reproducible."""
+    return make_texture(size, np.random.default_rng((band, size[0], size[1], slot)))
 
-    # Add noise pattern
-    for _ in range(50000):
-        x = random.randint(0, img.width-1)
-        y = random.randint(0, img.height-1)
-        # Vary the intensity based on position for a more natural look
-        intensity = random.randint(0, 40)
-        draw_texture.point((x, y), fill=(255, 255, 255, intensity))
 
-    # Apply texture with reduced opacity
-    img.paste(Image.alpha_composite(img.convert('RGBA'), texture))
+def precompute_texture_pool(size=DEFAULT_SIZE, pool_size=TEXTURE_POOL_SIZE):
+    """
+    Fill the texture pool for every temperature band at the given image size.
+
+    Args:
+        size (tuple): (width, height) of the images the textures will be applied to.
+        pool_size (int): Number of textures kept per band.
+    """
+    with _texture_pool_lock:
+        for band in range(5):
+            textures = _texture_pool.setdefault((band, tuple(size)), [])
+            while len(textures) < pool_size:
+                textures.append(_pool_texture(band, size, len(textures)))
+
+
+def get_pooled_texture(temp, size, rng=None):
+    """
+    Pick a texture from the pool for the temperature band, filling the pool on first use.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        size (tuple): (width, height) of the image.
+        rng (random.Random): Random generator used to pick the texture. A fresh one is created if omitted.
+
+    Returns:
+        tuple: Texture points as returned by make_texture.
+    """
+    if rng is None:
+        rng = random.Random()
+    band = temperature_band(temp)
+    slot = rng.randrange(TEXTURE_POOL_SIZE)
+    with _texture_pool_lock:
+        textures = _texture_pool.setdefault((band, tuple(size)), [])
+        while len(textures) <= slot:
+            textures.append(_pool_texture(band, size, len(textures)))
+        return textures[slot]
+
+
+def add_texture(img, temp, rain, reuse_texture=False, rng=None):
+    """
+    Add texture overlay to the image for more artistic feel.
+
+    The noise is a sparse set of points blended straight into the image, so
+    no full-size mask or RGBA copy is allocated. The texture does not depend on rain.
+
+    Args:
+        img (PIL.Image.Image): The image to texture, modified in place.
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        reuse_texture (bool): Reuse precomputed points from the band's texture pool
+            instead of generating new ones.
+        rng (random.Random): Random generator the texture is derived from. A fresh one is created if omitted.
+    """
+    if rng is None:
+        rng = random.Random()
+    if reuse_texture:
+        texture = get_pooled_texture(temp, img.size, rng)
+    else:
+        texture = make_texture(img.size, np.random.default_rng(rng.getrandbits(64)))
+    apply_texture(img, texture)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,82 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import art_generator
+import instrumentation
+
+
+class BackgroundWriter:
+    """
+    Encodes and writes images on a background thread.
+
+    submit() returns as soon as the image is queued, so the caller can render
+    the next image while this one is encoded and written. Pillow releases the
+    GIL while encoding, so the two overlap. The queue is bounded: when the
+    writer falls behind, submit() waits instead of piling up rendered images
+    in memory.
+
+        with BackgroundWriter() as writer:
+            for temp, rain, path in jobs:
+                writer.submit(art_generator.render_art(temp, rain), path, compress_level=1)
+    """
+
+    def __init__(self, max_pending=2):
+        """
+        Args:
+            max_pending (int): Images that may wait in the queue before submit() blocks.
+        """
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, img, output_path, image_format=None, recorder=None, **options):
+        """
+        Queue an image to be saved.
+
+        Args:
+            img (PIL.Image.Image): The image to save. It must not be modified afterwards.
+            output_path (str): Where to save it. The file appears only once completely written.
+            image_format (str): Pillow format name. Inferred from the output path if omitted.
+            recorder (instrumentation.StageRecorder): Records the duration of the save.
+            **options: Save options, see art_generator.encoder_options.
+
+        Returns:
+            concurrent.futures.Future: Resolves to output_path once written, or to the exception that stopped it.
+        """
+        future = Future()
+        self.queue.put((future, img, output_path, image_format, recorder or instrumentation.NULL_RECORDER, options))
+        return future
+
+    def _run(self):
+        """Save queued images until close() is called."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            future, img, output_path, image_format, recorder, options = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                image_format = image_format or art_generator.format_for_path(output_path)
+                with recorder.stage("save", format=image_format, background=True) as record:
+                    art_generator.save_image(img, output_path, image_format, **options)
+                    if recorder.enabled:
+                        record["bytes"] = os.path.getsize(output_path)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(output_path)
+
+    def close(self):
+        """Wait for every queued image to be written and stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -0,0 +1,250 @@
+import argparse
+import contextlib
+import functools
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import data_processor
+import art_generator
+import background_writer
+import render_cache
+import instrumentation
+
+
+def output_path_for(output_dir, month, year, ext="png"):
+    """
+    Build the output file path for a single (month, year) render.
+
+    Args:
+        output_dir (str): Directory the artwork is written to.
+        month (int): Month number (1-12).
+        year (int): Year.
+        ext (str): File extension, which also selects the image format.
+
+    Returns:
+        str: Path of the form "<output_dir>/weather_art_<year>_<month>.<ext>".
+    """
+    return os.path.join(output_dir, f"weather_art_{year}_{month:02d}.{ext}")
+
+
+def describe_period(period, key, window=12):
+    """
+    Name and seed the render of one period from data_processor.iter_period_weather.
+
+    Rolling windows, seasons and decades reuse the seed of a month they
+    cover, so each aggregate looks related to the monthly artwork.
+
+    Args:
+        period (str): One of data_processor.PERIODS.
+        key (tuple): The period's key as yielded by data_processor.iter_period_weather.
+        window (int): Number of months in each rolling window.
+
+    Returns:
+        tuple: (label, file name stem, seed, profile context), e.g.
+        ("summer 1999", "1999_summer", 199907, {"year": 1999, "season": "summer"}).
+    """
+    year, part = key
+    if period == "season":
+        middle = data_processor.SEASONS[part][1]
+        return f"{part} {year}", f"{year}_{part}", render_cache.seed_for(middle, year), {"year": year, "season": part}
+    if period == "decade":
+        label, stem = f"{part:02d}/{year}s", f"{year}s_{part:02d}"
+        return label, stem, render_cache.seed_for(part, year), {"decade": year, "month": part}
+    if period == "rolling":
+        label, stem = f"{part:02d}/{year} ({window}-month)", f"{year}_{part:02d}_rolling{window}"
+        return label, stem, render_cache.seed_for(part, year), {"year": year, "month": part, "window": window}
+    return f"{part:02d}/{year}", f"{year}_{part:02d}", render_cache.seed_for(part, year), {"month": part, "year": year}
+
+
+def build_jobs(df, output_dir, resume=True, ext="png", period="month", window=12):
+    """
+    Build the list of render jobs for every period of a kind in the dataset.
+
+    Args:
+        df (pandas.DataFrame or data_processor.WeatherIndex): The weather data.
+        output_dir (str): Directory the artwork is written to.
+        resume (bool): Skip jobs whose output file already exists.
+        ext (str): File extension of the artwork.
+        period (str): One of data_processor.PERIODS, by default every (month, year).
+        window (int): Number of months in each rolling window.
+
+    Returns:
+        tuple: (jobs, skipped) where jobs is a list of (label, seed, context, temp, rain, path)
+        tuples and skipped is the number of jobs already rendered.
+    """
+    jobs = []
+    skipped = 0
+    for key, temp, rain in data_processor.iter_period_weather(df, period, window):
+        label, stem, seed, context = describe_period(period, key, window)
+        path = os.path.join(output_dir, f"weather_art_{stem}.{ext}")
+        if resume and os.path.exists(path):
+            skipped += 1
+            continue
+        jobs.append((label, seed, context, temp, rain, path))
+    return jobs, skipped
+
+
+def render_chunk(chunk, profile_path=None, size=None, preview=False, save_options=None):
+    """
+    Render a chunk of batch jobs. Runs inside a worker process or thread.
+
+    Each image is handed to a BackgroundWriter, so it is encoded and written
+    while the next one renders. Files are written under a temporary name and
+    moved into place once complete, so an interrupted run never leaves a
+    truncated file that a resumed run would mistake for a finished one. The
+    chunk returns only after every write has finished.
+
+    Args:
+        chunk (list): (label, seed, context, temp, rain, path) jobs as produced by build_jobs.
+        profile_path (str): If given, per-stage timings are appended to this file as JSON lines.
+        size (tuple): (width, height) of the artwork. Defaults to the full render size.
+        preview (bool): Render low-resolution previews instead of full artwork.
+        save_options (dict): Encoder options, see art_generator.encoder_options.
+
+    Returns:
+        list: (label, path) for each job, where path is None if rendering failed.
+    """
+    save_options = save_options or {}
+    rendered = []
+    with contextlib.ExitStack() as stack:
+        render_sink = save_sink = None
+        if profile_path is not None:
+            # Line buffered, so records from the render and writer threads land as whole lines
+            render_sink = stack.enter_context(open(profile_path, "a", buffering=1))
+            save_sink = stack.enter_context(open(profile_path, "a", buffering=1))
+        writer = stack.enter_context(background_writer.BackgroundWriter())
+        for label, seed, context, temp, rain, path in chunk:
+            recorder = save_recorder = None
+            if profile_path is not None:
+                context = dict(context, pid=os.getpid())
+                recorder = instrumentation.StageRecorder(sink=render_sink, keep=False, **context)
+                save_recorder = instrumentation.StageRecorder(sink=save_sink, keep=False, **context)
+            try:
+                img = art_generator.render_art(temp, rain, seed=seed, recorder=recorder, size=size, preview=preview)
+            except Exception as e:
+                print(f"Error generating artwork for {label}: {e}")
+                rendered.append((label, None))
+                continue
+            rendered.append((label, writer.submit(img, path, recorder=save_recorder, **save_options)))
+
+    results = []
+    for label, future in rendered:
+        path = None
+        if future is not None:
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"Error saving artwork for {label}: {e}")
+        results.append((label, path))
+    return results
+
+
+def run_batch(df, output_dir, workers=None, chunksize=4, resume=True, profile_path=None, size=None, preview=False,
+              threads=False, image_format="PNG", compress_level=None, quality=None, optimize=False, period="month",
+              window=12):
+    """
+    Render every (month, year), or every period of another kind, across a process pool or a thread pool.
+
+    Args:
+        df (pandas.DataFrame or data_processor.WeatherIndex): The weather data.
+        output_dir (str): Directory the artwork is written to.
+        workers (int): Number of worker processes or threads. Defaults to the CPU count.
+        chunksize (int): Number of jobs handed to a worker process at a time.
+        resume (bool): Skip (month, year) pairs that were already rendered.
+        profile_path (str): If given, per-stage timings of every render are appended
+            to this file as JSON lines.
+        size (tuple): (width, height) of the artwork. Defaults to the full render size.
+        preview (bool): Render low-resolution previews instead of full artwork.
+        threads (bool): Render on threads in this process instead of worker processes,
+            which avoids process start-up and pickling for small batches.
+        image_format (str): Pillow format name of the artwork, e.g. "PNG", "WEBP" or "JPEG".
+        compress_level (int): PNG compression level or WebP effort, see art_generator.encoder_options.
+        quality (int): JPEG or WebP quality.
+        optimize (bool): Spend extra time on smaller PNG or JPEG files.
+        period (str): One of data_processor.PERIODS: render each month, each season of each
+            year, each calendar month of each decade, or the rolling mean ending at each month.
+        window (int): Number of months in each rolling window.
+
+    Returns:
+        tuple: (rendered, failed, skipped) counts.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ext = {"JPEG": "jpg"}.get(image_format, image_format.lower())
+    jobs, skipped = build_jobs(df, output_dir, resume=resume, ext=ext, period=period, window=window)
+    total = len(jobs)
+    print(f"{total} artworks to render, {skipped} already rendered")
+    if total == 0:
+        return 0, 0, skipped
+
+    rendered = 0
+    failed = 0
+    start = time.perf_counter()
+    save_options = art_generator.encoder_options(image_format, compress_level, quality, optimize)
+    chunk_fn = functools.partial(
+        render_chunk, profile_path=profile_path, size=size, preview=preview, save_options=save_options
+    )
+    chunks = [jobs[i:i + chunksize] for i in range(0, total, chunksize)]
+    pool = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with pool(max_workers=workers) as executor:
+        results = (result for chunk in executor.map(chunk_fn, chunks) for result in chunk)
+        for done, (label, path) in enumerate(results, 1):
+            elapsed = time.perf_counter() - start
+            remaining = elapsed / done * (total - done)
+            if path is None:
+                failed += 1
+                print(f"[{done}/{total}] {label} failed, {elapsed:.0f}s elapsed, ~{remaining:.0f}s remaining")
+            else:
+                rendered += 1
+                print(f"[{done}/{total}] {label} done, {elapsed:.0f}s elapsed, ~{remaining:.0f}s remaining")
+
+    return rendered, failed, skipped
+
+
+def main(argv=None):
+    """Command line entry point for batch rendering."""
+    parser = argparse.ArgumentParser(description="Render artwork for every month and year in the dataset.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--output-dir", default="renders", help="Directory to write the artwork to.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes or threads (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=4, help="Jobs handed to a worker at a time.")
+    parser.add_argument("--no-resume", action="store_true", help="Re-render artwork that already exists.")
+    parser.add_argument("--profile", help="Append per-stage render timings to this file as JSON lines.")
+    parser.add_argument("--size", type=int, help="Width and height of the artwork in pixels (default: 1200).")
+    parser.add_argument("--preview", action="store_true", help="Render quick low-resolution previews.")
+    parser.add_argument("--threads", action="store_true", help="Render on threads instead of worker processes.")
+    parser.add_argument("--period", choices=data_processor.PERIODS, default="month",
+                        help="Render each month, season, decade month or rolling window.")
+    parser.add_argument("--window", type=int, default=12, help="Months in each rolling window.")
+    parser.add_argument("--format", choices=["png", "webp", "jpeg"], default="png", help="Image format of the artwork.")
+    parser.add_argument("--compress-level", type=int, help="PNG compression level 0-9, or WebP effort 0-6.")
+    parser.add_argument("--quality", type=int, help="JPEG or WebP quality 0-100.")
+    parser.add_argument("--optimize", action="store_true", help="Spend extra time on smaller PNG or JPEG files.")
+    args = parser.parse_args(argv)
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+    try:
+        art_generator.encoder_options(args.format.upper(), args.compress_level, args.quality, args.optimize)
+    except ValueError as e:
+        parser.error(str(e))
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    df = data_processor.build_weather_index(data_processor.load_table(args.data))
+    if df is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+
+    rendered, failed, skipped = run_batch(
+        df, args.output_dir, workers=args.workers, chunksize=args.chunksize, resume=not args.no_resume,
+        profile_path=args.profile, size=(args.size, args.size) if args.size else None, preview=args.preview,
+        threads=args.threads, image_format=args.format.upper(), compress_level=args.compress_level,
+        quality=args.quality, optimize=args.optimize, period=args.period, window=args.window,
+    )
+    print(f"\nRendered {rendered}, failed {failed}, skipped {skipped}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
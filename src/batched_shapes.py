@@ -0,0 +1,239 @@
+import numpy as np
+
+# Unit geometry shared by every shape, computed once instead of per shape
+HEX_COS = np.cos(np.arange(6) * (np.pi / 3))
+HEX_SIN = np.sin(np.arange(6) * (np.pi / 3))
+PETAL_COS = {n: np.cos(np.arange(n) * (2 * np.pi / n)) for n in range(5, 9)}
+PETAL_SIN = {n: np.sin(np.arange(n) * (2 * np.pi / n)) for n in range(5, 9)}
+
+
+def _randint(gen, low, high, n):
+    """Vectorized random.randint: integers in [low, high] inclusive, low/high may be arrays."""
+    return gen.integers(low, np.asarray(high) + 1, n)
+
+
+def _box(x0, y0, x1, y1):
+    """Order box corners the way ImageDraw requires, for arrays of boxes."""
+    return np.stack([np.minimum(x0, x1), np.minimum(y0, y1), np.maximum(x0, x1), np.maximum(y0, y1)], axis=1)
+
+
+def _draw_particles(draw, gen, width, height, count, max_size, rgb, alpha_range):
+    """Draw rain particles from batched parameters."""
+    px = _randint(gen, 0, width, count)
+    py = _randint(gen, 0, height, count)
+    ps = _randint(gen, 1, max_size, count)
+    alpha = _randint(gen, alpha_range[0], alpha_range[1], count)
+    boxes = _box(px - ps, py - ps, px + ps, py + ps).tolist()
+    ellipse = draw.ellipse
+    r, g, b = rgb
+    for box, a in zip(boxes, alpha.tolist()):
+        ellipse(box, fill=(r, g, b, a))
+
+
+def draw_cold_band(draw, gen, temp, rain, width, height, n, num_particles):
+    """Light blue/white hexagons and tiny circles (temp < 20)."""
+    x = _randint(gen, 0, width, n)
+    y = _randint(gen, 0, height, n)
+    size = _randint(gen, 5, max(5, int(30 - temp + rain * 0.1)), n)
+    colors = [(200, 220, 255, 200), (255, 255, 255, 200)]
+    color_idx = gen.integers(0, 2, n).tolist()
+    is_hexagon = (gen.integers(0, 2, n) == 0).tolist()
+    circle_size = _randint(gen, 1, max(1, int(5 - rain * 0.05)), n)
+
+    hexagons = np.empty((n, 12))
+    hexagons[:, 0::2] = x[:, None] + size[:, None] * HEX_COS
+    hexagons[:, 1::2] = y[:, None] + size[:, None] * HEX_SIN
+    hexagons = hexagons.tolist()
+    circles = _box(x - circle_size, y - circle_size, x + circle_size, y + circle_size).tolist()
+
+    polygon, ellipse = draw.polygon, draw.ellipse
+    for i in range(n):
+        if is_hexagon[i]:
+            polygon(hexagons[i], fill=colors[color_idx[i]])
+        else:
+            ellipse(circles[i], fill=colors[color_idx[i]])
+
+
+def draw_mild_band(draw, gen, temp, rain, width, height, n, num_particles):
+    """Flowers and grass, with rain particles when rain is significant (20 <= temp < 25)."""
+    x = _randint(gen, 0, width, n)
+    y = _randint(gen, 0, height, n)
+    size = _randint(gen, 10, max(10, int(50 + (temp - 20) * 5 + rain * 0.1)), n)
+    is_flower = (gen.integers(0, 2, n) == 0).tolist()
+
+    # Flower parameters
+    flower_size = _randint(gen, size // 2, size, n)
+    num_petals = _randint(gen, 5, 8, n)
+    petal_color = np.stack([_randint(gen, 100, 200, n), _randint(gen, 50, 150, n), _randint(gen, 150, 250, n)], axis=1)
+    center_color = np.maximum(petal_color - 50, 0)
+    quarter = flower_size // 4
+    centers = _box(x - quarter, y - quarter, x + quarter, y + quarter).tolist()
+    sixth_x = (x - flower_size // 6).tolist()
+    sixth_y = (y - flower_size // 6).tolist()
+
+    # Grass parameters
+    grass_height = _randint(gen, size, size * 2, n)
+    grass_color = np.stack([_randint(gen, 80, 150, n), _randint(gen, 180, 255, n), _randint(gen, 80, 150, n)], axis=1)
+    curve = _randint(gen, -size // 2, size // 2, n)
+    grass_width = _randint(gen, 1, 3, n).tolist()
+    grass_lines = np.stack(
+        [x, y, x + curve, y - grass_height // 2, x, y - grass_height], axis=1
+    ).tolist()
+
+    petal_rgba = [tuple(c) + (220,) for c in petal_color.tolist()]
+    center_rgba = [tuple(c) + (220,) for c in center_color.tolist()]
+    grass_rgba = [tuple(c) + (220,) for c in grass_color.tolist()]
+    xs, ys, fs, ps = x.tolist(), y.tolist(), flower_size.tolist(), num_petals.tolist()
+
+    ellipse, line = draw.ellipse, draw.line
+    for i in range(n):
+        if is_flower[i]:
+            ellipse(centers[i], fill=center_rgba[i])
+            px = (xs[i] + fs[i] * PETAL_COS[ps[i]]).tolist()
+            py = (ys[i] + fs[i] * PETAL_SIN[ps[i]]).tolist()
+            x0, y0 = sixth_x[i], sixth_y[i]
+            for petal_x, petal_y in zip(px, py):
+                ellipse((min(x0, petal_x), min(y0, petal_y), max(x0, petal_x), max(y0, petal_y)), fill=petal_rgba[i])
+        else:
+            line(grass_lines[i], fill=grass_rgba[i], width=grass_width[i])
+
+    if num_particles:
+        _draw_particles(draw, gen, width, height, num_particles, 3, (100, 150, 200), (100, 200))
+
+
+def draw_warm_band(draw, gen, temp, rain, width, height, n, num_particles):
+    """Triangles, rectangles, rivers and leaves, with rain particles when rain is significant (25 <= temp < 30)."""
+    x = _randint(gen, 0, width, n)
+    y = _randint(gen, 0, height, n)
+    size = _randint(gen, 20, max(20, int(80 + (temp - 25) * 4 + rain * 0.1)), n)
+    colors = [(50, 100, 200, 220), (255, 220, 80, 220)]
+    color_idx = gen.integers(0, 2, n).tolist()
+    shape_type = gen.integers(0, 4, n).tolist()
+
+    # Triangle: jittered angles with independent x and y stretch per vertex
+    angles = np.arange(3) * (2 * np.pi / 3) + gen.uniform(-0.5, 0.5, (n, 3))
+    triangles = np.empty((n, 6))
+    triangles[:, 0::2] = x[:, None] + size[:, None] * gen.uniform(1, 2, (n, 3)) * np.cos(angles)
+    triangles[:, 1::2] = y[:, None] + size[:, None] * gen.uniform(1, 2, (n, 3)) * np.sin(angles)
+    triangles = triangles.tolist()
+
+    # Rectangle
+    rects = _box(x, y, x + _randint(gen, size // 2, size, n), y + _randint(gen, size // 2, size, n)).tolist()
+
+    # River
+    river_width = _randint(gen, size // 4, size // 2, n).tolist()
+    river_length = _randint(gen, size * 2, size * 5, n)
+    river_angle = gen.uniform(0, 2 * np.pi, n)
+    rivers = np.stack(
+        [x, y, x + (river_length * np.cos(river_angle)).astype(int), y + (river_length * np.sin(river_angle)).astype(int)],
+        axis=1,
+    ).tolist()
+
+    # Leaf
+    leaf_size = _randint(gen, size // 4, size // 2, n)
+    leaf_green = _randint(gen, 150, 220, n).tolist()
+    leaves = _box(x - leaf_size, y - leaf_size, x + leaf_size, y + leaf_size).tolist()
+
+    polygon, rectangle, line, ellipse = draw.polygon, draw.rectangle, draw.line, draw.ellipse
+    river_color = (50, 150, 200, 220)
+    for i in range(n):
+        kind = shape_type[i]
+        if kind == 0:
+            polygon(triangles[i], fill=colors[color_idx[i]])
+        elif kind == 1:
+            rectangle(rects[i], fill=colors[color_idx[i]])
+        elif kind == 2:
+            line(rivers[i], fill=river_color, width=river_width[i], joint="curve")
+        else:
+            ellipse(leaves[i], fill=(50, leaf_green[i], 50, 220))
+
+    if num_particles:
+        _draw_particles(draw, gen, width, height, num_particles, 4, (120, 160, 210), (120, 220))
+
+
+def draw_hot_band(draw, gen, temp, rain, width, height, n, num_particles):
+    """Squares and spikes, plus thunder and gray rain when rain is significant (30 <= temp < 40)."""
+    has_significant_rain = rain > 20
+    x = _randint(gen, 0, width, n)
+    y = _randint(gen, 0, height, n)
+    size = _randint(gen, 25, max(25, int(100 + (temp - 30) * 5 + rain * 0.1)), n)
+
+    if has_significant_rain:
+        # Grayish combined with red-orange
+        rgb = np.stack([_randint(gen, 180, 220, n), _randint(gen, 80, 120, n), _randint(gen, 60, 100, n)], axis=1)
+        # Like random.uniform, the upper bound may fall below the lower one
+        gray_blend = (0.3 + (min(0.6, rain * 0.001) - 0.3) * gen.random(n))[:, None]
+        rgb = (rgb * (1 - gray_blend) + 150 * gray_blend).astype(int)
+        shape_type = gen.integers(0, 3, n).tolist()
+    else:
+        # Orange and red
+        orange = np.stack([np.full(n, 255), _randint(gen, 100, 160, n), np.zeros(n, dtype=int)], axis=1)
+        red = np.stack([_randint(gen, 200, 255, n), np.zeros(n, dtype=int), np.zeros(n, dtype=int)], axis=1)
+        rgb = np.where((gen.integers(0, 2, n) == 0)[:, None], orange, red)
+        shape_type = gen.integers(0, 2, n).tolist()
+    colors = [tuple(c) + (220,) for c in rgb.tolist()]
+
+    # Square
+    square_size = _randint(gen, size // 2, size, n)
+    squares = _box(x, y, x + square_size, y + square_size).tolist()
+
+    # Spike
+    spike_length = _randint(gen, size // 2, size, n)
+    spike_width = _randint(gen, 1, 5, n).tolist()
+    spike_angle = gen.uniform(0, 2 * np.pi, n)
+    spikes = np.stack(
+        [x, y, x + (spike_length * np.cos(spike_angle)).astype(int), y + (spike_length * np.sin(spike_angle)).astype(int)],
+        axis=1,
+    ).tolist()
+
+    # Thunder: simplified zig-zag
+    t = _randint(gen, size, size * 2, n)
+    thunder = np.stack([x, y, x + t // 3, y + t // 2, x, y + t, x + t // 2, y + t // 2, x + t, y], axis=1).tolist()
+    thunder_width = _randint(gen, 2, 5, n).tolist()
+
+    rectangle, line = draw.rectangle, draw.line
+    spike_red = (255, 0, 0, 220)
+    thunder_color = (255, 255, 0, 220)
+    for i in range(n):
+        kind = shape_type[i]
+        if kind == 0:
+            rectangle(squares[i], fill=colors[i])
+        elif kind == 1:
+            line(spikes[i], fill=spike_red if has_significant_rain else colors[i], width=spike_width[i])
+        else:
+            line(thunder[i], fill=thunder_color, width=thunder_width[i])
+
+    if num_particles:
+        _draw_particles(draw, gen, width, height, num_particles, 5, (150, 150, 150), (150, 250))
+
+
+def draw_band_shapes(draw, gen, temp, rain, width, height, density=1.0, particles=True):
+    """
+    Draw the shapes for the temperature band of temp using batched parameter generation.
+
+    All random parameters and trigonometry for a band are generated up front as
+    NumPy arrays, so the per-shape work is reduced to a single draw call. The
+    shapes follow the same distributions and drawing order as the per-shape
+    loop in art_generator.draw_shapes, and the same counts from art_generator.shape_counts.
+
+    Args:
+        draw (PIL.ImageDraw.ImageDraw): Drawing context of the image.
+        gen (numpy.random.Generator): Random generator for all shape parameters.
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        width (int): Image width.
+        height (int): Image height.
+        density (float): Multiplier for the number of shapes and particles.
+        particles (bool): Draw rain particles.
+    """
+    import art_generator  # Imported here, art_generator builds on this module
+
+    counts = art_generator.shape_counts(temp, rain, density, particles)
+    if temp < 20:
+        draw_cold_band(draw, gen, temp, rain, width, height, *counts)
+    elif temp < 25:
+        draw_mild_band(draw, gen, temp, rain, width, height, *counts)
+    elif temp < 30:
+        draw_warm_band(draw, gen, temp, rain, width, height, *counts)
+    elif temp < 40:
+        draw_hot_band(draw, gen, temp, rain, width, height, *counts)
@@ -0,0 +1,307 @@
+import argparse
+import importlib
+import io
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, where peak memory is not reported
+    resource = None
+
+import numpy as np
+import PIL
+from PIL import Image, ImageDraw
+
+import data_processor
+import art_generator
+import batched_shapes
+
+# Synthetic cases outside the dataset's range: the 30-40°C band and extreme rainfall
+EXTRA_CASES = [
+    (5.0, 150.0),
+    (32.0, 5.0),
+    (35.0, 50.0),
+    (38.0, 500.0),
+]
+
+# Stages timed once per run and once per (temp, rain) case, see make_stage
+DATA_STAGES = ("load_data", "get_weather_data", "get_weather_data_index")
+RENDER_STAGES = ("shapes", "shapes_batched", "add_texture", "png_save", "render_art")
+
+
+def max_rss_bytes():
+    """Return the peak resident set size of this process in bytes, or None where it is not available."""
+    try:
+        # On Linux, ru_maxrss carries over from the parent into a new process, VmHWM starts afresh
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def stage_peak_memory(stage, kwargs):
+    """
+    Run a stage once in a fresh process and return how far it raised the peak RSS.
+
+    Unlike tracemalloc, resident memory includes Pillow's image buffers. A fresh
+    process is needed because the peak never goes down, so a stage measured after
+    another would only show the amount by which it exceeds the earlier peak.
+    Runs inside a worker process.
+
+    Returns:
+        int: Peak RSS growth in bytes, including one-time allocations such as texture pools.
+    """
+    fn = make_stage(stage, **kwargs)
+    before = max_rss_bytes()
+    fn()
+    return max_rss_bytes() - before
+
+
+def measure(stage, repeats, **kwargs):
+    """
+    Time a stage and record its peak memory.
+
+    Timings are taken in this process, and peak memory on one more run in a
+    fresh process, see stage_peak_memory.
+
+    Args:
+        stage (str): Stage name, see make_stage.
+        repeats (int): Number of timed runs.
+        **kwargs: Inputs of the stage, see make_stage.
+
+    Returns:
+        dict: best_s, mean_s and peak_rss_bytes (None where RSS is not available).
+    """
+    fn = make_stage(stage, **kwargs)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if max_rss_bytes() is not None:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            peak = executor.submit(stage_peak_memory, stage, kwargs).result()
+    return {"best_s": min(times), "mean_s": sum(times) / len(times), "peak_rss_bytes": peak}
+
+
+def weather_cases(df):
+    """
+    Pick benchmark inputs that span the dataset: for every temperature band present,
+    the driest, median and wettest months, plus the synthetic EXTRA_CASES.
+
+    Args:
+        df (pandas.DataFrame): DataFrame containing the weather data.
+
+    Returns:
+        list: (temp, rain) tuples.
+    """
+    cases = []
+    bands = df['tem'].map(art_generator.temperature_band)
+    for _, group in df.groupby(bands):
+        ordered = group.sort_values('rain')
+        for position in (0, len(ordered) // 2, len(ordered) - 1):
+            row = ordered.iloc[position]
+            cases.append((round(float(row['tem']), 2), round(float(row['rain']), 2)))
+    cases.extend(EXTRA_CASES)
+    return list(dict.fromkeys(cases))
+
+
+def blank_canvas(temp):
+    """Create an image with just the background drawn, as render_art does before the shapes."""
+    width, height = art_generator.DEFAULT_SIZE
+    return Image.new('RGB', (width, height), art_generator.background_color(temp))
+
+
+def lookup_queries(df, lookups):
+    """Pick (month, year) queries from random rows of the dataset, the same on every call."""
+    picks = np.random.default_rng(0).integers(0, len(df), lookups)
+    return list(zip(df['Month'].to_numpy()[picks].tolist(), df['Year'].to_numpy()[picks].tolist()))
+
+
+def make_stage(stage, temp=None, rain=None, csv_path=None, lookups=1000):
+    """
+    Prepare the inputs of a benchmark stage.
+
+    Args:
+        stage (str): One of DATA_STAGES or RENDER_STAGES.
+        temp (float): The average temperature in Celsius, for render stages.
+        rain (float): The average rainfall in mm, for render stages.
+        csv_path (str): Path to the weather CSV file, for data stages.
+        lookups (int): Number of weather lookups per lookup stage.
+
+    Returns:
+        callable: Runs the stage once. Called with no arguments.
+    """
+    width, height = art_generator.DEFAULT_SIZE
+
+    if stage == "load_data":
+        importlib.import_module("pandas")  # Imported up front so the import is not part of the measurement
+        return lambda: data_processor.load_data(csv_path)
+    if stage in ("get_weather_data", "get_weather_data_index"):
+        df = data_processor.load_data(csv_path)
+        data = df if stage == "get_weather_data" else data_processor.build_weather_index(df)
+        queries = lookup_queries(df, lookups)
+
+        def lookup_all():
+            for month, year in queries:
+                data_processor.get_weather_data(data, month, year)
+        return lookup_all
+
+    if stage == "shapes":
+        def shapes():
+            img = blank_canvas(temp)
+            art_generator.draw_shapes(ImageDraw.Draw(img, 'RGBA'), random.Random(0), temp, rain, width, height)
+        return shapes
+    if stage == "shapes_batched":
+        def shapes_batched():
+            img = blank_canvas(temp)
+            batched_shapes.draw_band_shapes(
+                ImageDraw.Draw(img, 'RGBA'), np.random.default_rng(0), temp, rain, width, height
+            )
+        return shapes_batched
+    if stage == "add_texture":
+        return lambda: art_generator.add_texture(blank_canvas(temp), temp, rain)
+    if stage == "png_save":
+        img = art_generator.render_art(temp, rain, seed=0)
+        return lambda: img.save(io.BytesIO(), format="PNG")
+    if stage == "render_art":
+        return lambda: art_generator.render_art(temp, rain, seed=0)
+    raise ValueError(f"Unknown stage {stage!r}")
+
+
+def bench_case(temp, rain, repeats):
+    """Benchmark every render stage for one (temp, rain) input."""
+    num_shapes, num_particles = art_generator.shape_counts(temp, rain)
+    results = {stage: measure(stage, repeats, temp=temp, rain=rain) for stage in RENDER_STAGES}
+    for stage in ("shapes", "shapes_batched"):
+        results[stage]["shapes_per_s"] = (num_shapes + num_particles) / results[stage]["best_s"]
+
+    return {
+        "temp": temp,
+        "rain": rain,
+        "band": art_generator.temperature_band(temp),
+        "shapes": num_shapes,
+        "particles": num_particles,
+        "stages": results,
+    }
+
+
+def git_commit():
+    """Return the current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(csv_path, repeats=3, lookups=1000):
+    """
+    Run the full benchmark suite.
+
+    Args:
+        csv_path (str): Path to the weather CSV file.
+        repeats (int): Timed runs per measurement.
+        lookups (int): Number of weather lookups per lookup benchmark.
+
+    Returns:
+        dict: JSON-serializable benchmark results, or None if the data could not be loaded.
+    """
+    df = data_processor.load_data(csv_path)
+    if df is None:
+        return None
+    data_results = {
+        stage: measure(stage, repeats, csv_path=csv_path, lookups=lookups) for stage in DATA_STAGES
+    }
+    for name in ("get_weather_data", "get_weather_data_index"):
+        data_results[name]["lookups_per_s"] = lookups / data_results[name]["best_s"]
+
+    cases = []
+    for temp, rain in weather_cases(df):
+        print(f"Benchmarking temp={temp}°C rain={rain}mm")
+        cases.append(bench_case(temp, rain, repeats))
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "repeats": repeats,
+        "max_rss_bytes": max_rss_bytes(),
+        "data": data_results,
+        "cases": cases,
+    }
+
+
+def flatten(results):
+    """Map every measurement to a flat "<group>/<stage>" name for comparisons."""
+    flat = {f"data/{name}": result for name, result in results["data"].items()}
+    for case in results["cases"]:
+        for stage, result in case["stages"].items():
+            flat[f"{case['temp']}C_{case['rain']}mm/{stage}"] = result
+    return flat
+
+
+def print_report(results, baseline=None):
+    """Print best times, with the ratio to a baseline run when one is given."""
+    previous = flatten(baseline) if baseline else {}
+    for name, result in flatten(results).items():
+        peak = result.get("peak_rss_bytes")
+        peak = f"{peak / 1024:9.0f}KiB" if peak is not None else f"{'n/a':>12s}"
+        line = f"{name:40s} {result['best_s'] * 1000:9.2f}ms  peak {peak}"
+        if "shapes_per_s" in result:
+            line += f"  {result['shapes_per_s']:10.0f} shapes/s"
+        if name in previous:
+            line += f"  x{result['best_s'] / previous[name]['best_s']:.2f} vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    """Command line entry point for the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Benchmark data loading and every render stage.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per measurement.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.data, repeats=args.repeats)
+    if results is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+    print_report(results, baseline)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
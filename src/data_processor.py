@@ -1,125 +1,870 @@
-import pandas as pd
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import warnings
+
 import numpy as np
 
-def load_data(file_path):
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherDataError(Exception):
+    """Base class for errors raised when querying weather data."""
+
+
+class InvalidQueryError(WeatherDataError, ValueError):
+    """The requested month or year is not a valid number or is out of range."""
+
+
+class NoDataError(WeatherDataError, LookupError):
+    """The dataset has no usable values for the requested month and year."""
+
+
+def load_data(file_path, recorder=None):
     """
     Load weather data from CSV file.
 
     Args:
         file_path (str): Path to the CSV file.
+        recorder (instrumentation.StageRecorder): Records the load duration and size.
+            Instrumentation is off if omitted.
 
     Returns:
         pandas.DataFrame: DataFrame containing the weather data.
     """
+    # Imported here so callers that only use the binary table never pay for pandas
+    import pandas as pd
+
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+
     try:
-        df = pd.read_csv(file_path)
-        print(f"Successfully loaded data from {file_path}")
-        # **DEBUG: Print column names and types**
-        print("DataFrame columns and types:")
-        print(df.info())
+        with recorder.stage("load_data", path=file_path) as record:
+            df = pd.read_csv(file_path)
+            if recorder.enabled:
+                record["rows"] = len(df)
+                record["bytes"] = int(df.memory_usage().sum())
+        logger.info("Successfully loaded data from %s", file_path)
+        if logger.isEnabledFor(logging.DEBUG):
+            info = io.StringIO()
+            df.info(buf=info)
+            logger.debug("DataFrame columns and types:\n%s", info.getvalue())
         return df
     except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
+        logger.error("Error: File '%s' not found.", file_path)
         return None
     except pd.errors.EmptyDataError:
-        print(f"Error: File '{file_path}' is empty.")
+        logger.error("Error: File '%s' is empty.", file_path)
         return None
     except pd.errors.ParserError:
-        print(f"Error: Unable to parse '{file_path}'. Please check the file format.")
+        logger.error("Error: Unable to parse '%s'. Please check the file format.", file_path)
         return None
     except Exception as e:
-        print(f"Error loading data: {e}")
+        logger.error("Error loading data: %s", e)
         return None
 
-def get_weather_data(df, month, year):
+DEFAULT_CHUNKSIZE = 500_000
+
+# Running aggregate columns kept for each value column and how partial results combine
+_AGGREGATES = {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def aggregate_csv(file_path, chunksize=DEFAULT_CHUNKSIZE, recorder=None):
     """
-    Extract average temperature and rainfall for a specific month and year.
+    Stream a large weather CSV in chunks and reduce it to per-(year, month) aggregates.
+
+    Meant for daily or multi-station files too large to load at once. Only the
+    Year, Month, tem and rain columns are read, and each chunk is folded into
+    running count/sum/min/max values, so memory depends on the chunk size and
+    the number of distinct months rather than the file size.
+
+    The result has Year, Month, tem and rain columns holding the monthly means,
+    so it can be used anywhere a DataFrame from load_data is expected, e.g.
+    build_weather_index or get_weather_data. Per-column count, sum, min and max
+    are kept as tem_count, tem_sum, ..., rain_max.
 
     Args:
-        df (pandas.DataFrame): DataFrame containing the weather data.
-        month (str): Month number (1-12).
-        year (str): Year (1901-2023).
+        file_path (str): Path to the CSV file.
+        chunksize (int): Rows read per chunk.
+        recorder (instrumentation.StageRecorder): Records the duration of each chunk.
+            Instrumentation is off if omitted.
 
     Returns:
-        tuple: (average temperature, average rainfall) or (None, None) if data not found.
+        pandas.DataFrame: One row per (year, month), or None if the file could not be read.
     """
-    if df is None:
-        return None, None
+    import pandas as pd
+
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+
+    agg_spec = {
+        f"{column}_{name}": (column, name)
+        for column in ('tem', 'rain')
+        for name in _AGGREGATES
+    }
+    combine_spec = {f"{column}_{name}": how for column in ('tem', 'rain') for name, how in _AGGREGATES.items()}
 
+    running = None
+    rows = 0
     try:
-        # Convert inputs to integers
-        month_int = int(month)
-        year_int = int(year)
+        reader = pd.read_csv(file_path, usecols=['Year', 'Month', 'tem', 'rain'], chunksize=chunksize)
+        for number, chunk in enumerate(reader):
+            with recorder.stage("aggregate_chunk", chunk=number, rows=len(chunk)):
+                chunk_agg = chunk.groupby(['Year', 'Month']).agg(**agg_spec)
+                if running is None:
+                    running = chunk_agg
+                else:
+                    running = pd.concat([running, chunk_agg]).groupby(level=['Year', 'Month']).agg(combine_spec)
+            rows += len(chunk)
+    except FileNotFoundError:
+        logger.error("Error: File '%s' not found.", file_path)
+        return None
+    except ValueError as e:
+        # Raised by read_csv for missing columns as well as malformed values
+        logger.error("Error: Unable to aggregate '%s': %s", file_path, e)
+        return None
+    except Exception as e:
+        logger.error("Error aggregating data: %s", e)
+        return None
+
+    if running is None:
+        logger.error("Error: File '%s' is empty.", file_path)
+        return None
+
+    running = running.sort_index().reset_index()
+    running['Year'] = running['Year'].astype(int)
+    running['Month'] = running['Month'].astype(int)
+    for column in ('tem', 'rain'):
+        counts = running[f"{column}_count"]
+        running[column] = running[f"{column}_sum"].where(counts > 0) / counts.where(counts > 0)
+
+    logger.info("Aggregated %d rows from %s into %d months", rows, file_path, len(running))
+    value_columns = [f"{column}_{name}" for column in ('tem', 'rain') for name in _AGGREGATES]
+    return running[['Year', 'Month', 'tem', 'rain'] + value_columns]
+
+
+# Compact on-disk form of the weather CSV, memory-mapped on later starts
+TABLE_DTYPE = np.dtype([('Year', '<i2'), ('Month', '<i2'), ('tem', '<f4'), ('rain', '<f4')])
+# Bump to rebuild cached tables, e.g. after a parsing fix
+TABLE_FORMAT_VERSION = 2
+
+
+def _file_sha256(file_path):
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_csv_table(file_path):
+    """
+    Parse the weather CSV into a TABLE_DTYPE structured array using only the csv module and NumPy.
+
+    Rows that are too short or hold a value that is not a number are skipped
+    with a logged error, as are rows without a whole Year and Month. Empty
+    tem and rain cells become NaN.
+
+    Raises:
+        ValueError: If the header lacks a column or no row could be parsed.
+    """
+    limits = {name: np.iinfo(TABLE_DTYPE[name]) for name in TABLE_DTYPE.names if TABLE_DTYPE[name].kind == 'i'}
+    with open(file_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(name) for name in TABLE_DTYPE.names]
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            try:
+                values = tuple(float(row[i]) if row[i] != '' else np.nan for i in columns)
+            except IndexError:
+                logger.error("Skipping line %d of '%s': expected %d columns, got %d",
+                             reader.line_num, file_path, len(header), len(row))
+                continue
+            except ValueError as e:
+                logger.error("Skipping line %d of '%s': %s", reader.line_num, file_path, e)
+                continue
+            # Integer columns may be written as "6.0" by some exports, but never empty or fractional
+            invalid = [
+                name for name, value in zip(TABLE_DTYPE.names, values)
+                if name in limits and not (value.is_integer() and limits[name].min <= value <= limits[name].max)
+            ]
+            if invalid:
+                logger.error("Skipping line %d of '%s': %s must be a whole number",
+                             reader.line_num, file_path, " and ".join(invalid))
+                continue
+            rows.append(values)
+    if not rows:
+        raise ValueError("no valid rows")
+    return np.array(rows, dtype=TABLE_DTYPE)
+
+
+def load_table(file_path, cache_path=None, recorder=None):
+    """
+    Load the weather CSV as a compact structured array, using a binary cache.
+
+    The first call parses the CSV into int16 Year/Month and float32 tem/rain
+    columns and writes them to a .npy file next to it, along with the CSV's
+    modification time, size and SHA-256. Later calls memory-map the .npy file
+    as long as the CSV is unchanged, without importing pandas. A CSV whose
+    mtime changed is re-hashed, and the cache is rebuilt only if its contents differ.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        cache_path (str): Where to keep the binary table. Defaults to the CSV path with a .npy extension.
+        recorder (instrumentation.StageRecorder): Records the load duration and whether the cache was used.
+            Instrumentation is off if omitted.
+
+    Returns:
+        numpy.ndarray: Structured array with TABLE_DTYPE, or None if the file could not be loaded.
+    """
+    if cache_path is None:
+        cache_path = os.path.splitext(file_path)[0] + '.npy'
+    meta_path = cache_path + '.json'
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+
+    with recorder.stage("load_table", path=file_path) as record:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            logger.error("Error: File '%s' not found.", file_path)
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+        if meta is not None and meta.get('version') == TABLE_FORMAT_VERSION and os.path.exists(cache_path):
+            fresh = meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+            if not fresh and meta.get('sha256') == _file_sha256(file_path):
+                # Touched but not changed: remember the new mtime so the next start skips hashing
+                meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_table_meta(meta_path, meta)
+                fresh = True
+            if fresh:
+                table = np.load(cache_path, mmap_mode='r')
+                record["cached"] = True
+                record["rows"] = len(table)
+                logger.info("Successfully loaded data from %s (cached in %s)", file_path, cache_path)
+                return table
+
+        try:
+            table = _parse_csv_table(file_path)
+        except (OSError, ValueError, StopIteration) as e:
+            logger.error("Error: Unable to parse '%s': %s", file_path, e)
+            return None
+        record["cached"] = False
+        record["rows"] = len(table)
+
+        try:
+            partial_path = f"{cache_path}.{os.getpid()}.partial"
+            with open(partial_path, 'wb') as f:
+                np.save(f, table)
+            os.replace(partial_path, cache_path)
+            _write_table_meta(meta_path, {
+                'version': TABLE_FORMAT_VERSION,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': _file_sha256(file_path),
+            })
+        except OSError as e:
+            logger.warning("Could not write table cache %s: %s", cache_path, e)
+        logger.info("Successfully loaded data from %s", file_path)
+        return table
+
+
+def _write_table_meta(meta_path, meta):
+    """Atomically write the table cache metadata."""
+    partial_path = f"{meta_path}.{os.getpid()}.partial"
+    with open(partial_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(partial_path, meta_path)
+
+
+# Meteorological seasons in table order; winter takes its December from the year before
+SEASONS = {'winter': (12, 1, 2), 'spring': (3, 4, 5), 'summer': (6, 7, 8), 'autumn': (9, 10, 11)}
+
+# Periods iter_period_weather can step through
+PERIODS = ('month', 'season', 'decade', 'rolling')
+
+
+def _nanmean(values, axis):
+    """NaN-aware mean that reports all-NaN slices as NaN without warning."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(values, axis=axis)
+
+
+def _weather_pair(pair):
+    """Convert a (temperature, rainfall) array pair to floats, or (None, None) if either is NaN."""
+    temp, rain = pair
+    if np.isnan(temp) or np.isnan(rain):
+        return None, None
+    return float(temp), float(rain)
+
+
+class WeatherIndex:
+    """
+    Dense (year, month) lookup table of average temperature and rainfall.
+
+    Values are stored in a NumPy array of shape [years, 12, 2] holding
+    (temperature, rainfall), with NaN where the dataset has no rows. The table
+    is built once, after which single lookups are constant time and range
+    queries are array slices.
+    """
+
+    TEMP = 0
+    RAIN = 1
 
-        # **DEBUG: Print input values**
-        print(f"DEBUG: Input month_int: {month_int}, year_int: {year_int}")
+    def __init__(self, first_year, values):
+        """
+        Args:
+            first_year (int): Year stored at index 0 of values.
+            values (numpy.ndarray): Array of shape [years, 12, 2].
+        """
+        self.first_year = int(first_year)
+        self.values = values
+        self._statistics = None
+        self._aggregates = {}
 
-        # Validate inputs
-        if not (1 <= month_int <= 12):
-            print(f"Error: Month must be between 1 and 12, got {month_int}")
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Build the index from a weather DataFrame, averaging duplicate (year, month) rows.
+
+        Args:
+            df (pandas.DataFrame): DataFrame containing the weather data.
+
+        Returns:
+            WeatherIndex: The lookup table.
+        """
+        grouped = df.groupby(['Year', 'Month'])[['tem', 'rain']].mean()
+        years = grouped.index.get_level_values('Year').to_numpy(dtype=int)
+        months = grouped.index.get_level_values('Month').to_numpy(dtype=int)
+        valid = (months >= 1) & (months <= 12)
+        years, months = years[valid], months[valid]
+        first_year = int(years.min())
+        values = np.full((int(years.max()) - first_year + 1, 12, 2), np.nan)
+        values[years - first_year, months - 1] = grouped.to_numpy(dtype=float)[valid]
+        return cls(first_year, values)
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Build the index from a structured array such as load_table returns,
+        averaging duplicate (year, month) rows and ignoring NaN values.
+
+        Args:
+            table (numpy.ndarray): Structured array with Year, Month, tem and rain fields.
+
+        Returns:
+            WeatherIndex: The lookup table.
+        """
+        years = np.asarray(table['Year'], dtype=np.int64)
+        months = np.asarray(table['Month'], dtype=np.int64)
+        valid = (months >= 1) & (months <= 12)
+        years, months = years[valid], months[valid]
+        first_year = int(years.min())
+        num_years = int(years.max()) - first_year + 1
+        cells = (years - first_year) * 12 + (months - 1)
+
+        values = np.empty((num_years * 12, 2))
+        for i, name in enumerate(('tem', 'rain')):
+            column = np.asarray(table[name], dtype=np.float64)[valid]
+            present = ~np.isnan(column)
+            sums = np.bincount(cells[present], weights=column[present], minlength=num_years * 12)
+            counts = np.bincount(cells[present], minlength=num_years * 12)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values[:, i] = sums / counts
+        return cls(first_year, values.reshape(num_years, 12, 2))
+
+    @property
+    def last_year(self):
+        """int: Last year covered by the index."""
+        return self.first_year + len(self.values) - 1
+
+    @property
+    def years(self):
+        """numpy.ndarray: Every year covered by the index, in order."""
+        return np.arange(self.first_year, self.last_year + 1)
+
+    @property
+    def first_decade(self):
+        """int: First decade covered by the index, e.g. 1900."""
+        return self.first_year // 10 * 10
+
+    def lookup(self, month, year):
+        """
+        Get the average temperature and rainfall for a month and year.
+
+        Args:
+            month (int): Month number (1-12).
+            year (int): Year.
+
+        Returns:
+            tuple: (average temperature, average rainfall) or (None, None) if there is no data.
+        """
+        row = year - self.first_year
+        if not (0 <= row < len(self.values)) or not (1 <= month <= 12):
+            return None, None
+        temp, rain = self.values[row, month - 1]
+        if np.isnan(temp) or np.isnan(rain):
             return None, None
+        return float(temp), float(rain)
+
+    def year_range(self, start_year, end_year):
+        """
+        Get every month for an inclusive range of years, e.g. 1950-1960.
+
+        Args:
+            start_year (int): First year of the range.
+            end_year (int): Last year of the range.
+
+        Returns:
+            numpy.ndarray: View of shape [years, 12, 2], clipped to the years in the index.
+
+        Raises:
+            InvalidQueryError: If end_year is before start_year.
+        """
+        if end_year < start_year:
+            raise InvalidQueryError(f"Range must not end before it starts, got {start_year} to {end_year}")
+        start = max(start_year - self.first_year, 0)
+        end = max(end_year - self.first_year + 1, 0)
+        return self.values[start:end]
+
+    def month_series(self, month):
+        """
+        Get the same month across every year, e.g. all Julys.
+
+        Args:
+            month (int): Month number (1-12).
+
+        Returns:
+            numpy.ndarray: View of shape [years, 2] ordered by year.
+
+        Raises:
+            InvalidQueryError: If month is not between 1 and 12.
+        """
+        if not 1 <= month <= 12:
+            raise InvalidQueryError(f"Month must be between 1 and 12, got {month}")
+        return self.values[:, month - 1]
+
+    def value_bounds(self):
+        """
+        Get the range of values in the dataset.
+
+        Returns:
+            tuple: (minimum temperature, maximum temperature, maximum rainfall).
+        """
+        temp = self.values[..., self.TEMP]
+        rain = self.values[..., self.RAIN]
+        return float(np.nanmin(temp)), float(np.nanmax(temp)), float(np.nanmax(rain))
+
+    def statistics(self):
+        """
+        Summarize the dataset per year and per calendar month.
+
+        Every statistic is a NaN-aware reduction over an axis of the value
+        array, so the whole summary is a handful of array operations however
+        many years there are. The result is computed once and kept.
 
-        # **DEBUG: Check unique values in 'Month' column**
-        if 'Month' in df.columns:
-            print(f"DEBUG: Unique values in 'Month' column: {df['Month'].unique()}")
-            print(f"DEBUG: Type of 'Month' column: {df['Month'].dtype}")
-        else:
-            print("DEBUG: 'Month' column not found in DataFrame.")
+        Returns:
+            dict: {"year": {...}, "month": {...}} where each inner dict maps a
+            statistic name to an array, indexed by year - first_year or month - 1.
+            Years report month count, mean/min/max temperature and total rainfall.
+            Months report count and mean/min/max of temperature and rainfall
+            across the years, the monthly climate the anomalies are taken against.
+            Statistics with no data are NaN.
+        """
+        if self._statistics is None:
+            temp = self.values[..., self.TEMP]
+            rain = self.values[..., self.RAIN]
+            present = ~(np.isnan(temp) | np.isnan(rain))
+            with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+                # All-NaN years or months are expected and reported as NaN
+                warnings.simplefilter('ignore', RuntimeWarning)
+                self._statistics = {
+                    'year': {
+                        'months': present.sum(axis=1),
+                        'temp_mean': np.nanmean(temp, axis=1),
+                        'temp_min': np.nanmin(temp, axis=1),
+                        'temp_max': np.nanmax(temp, axis=1),
+                        'rain_total': np.where(present.any(axis=1), np.nansum(rain, axis=1), np.nan),
+                    },
+                    'month': {
+                        'years': present.sum(axis=0),
+                        'temp_mean': np.nanmean(temp, axis=0),
+                        'temp_min': np.nanmin(temp, axis=0),
+                        'temp_max': np.nanmax(temp, axis=0),
+                        'rain_mean': np.nanmean(rain, axis=0),
+                        'rain_min': np.nanmin(rain, axis=0),
+                        'rain_max': np.nanmax(rain, axis=0),
+                    },
+                }
+        return self._statistics
 
+    def _complete(self):
+        """Get the value array with both values NaN wherever either is missing, as lookup treats them."""
+        if 'complete' not in self._aggregates:
+            missing = np.isnan(self.values).any(axis=2)
+            self._aggregates['complete'] = np.where(missing[..., None], np.nan, self.values)
+        return self._aggregates['complete']
 
-        # Extract data for the specified month and year
-        # Ensure 'Month' column is integer type for comparison
-        if 'Month' in df.columns and df['Month'].dtype != int:
-             try:
-                 df['Month'] = df['Month'].astype(int)
-                 print("DEBUG: Converted 'Month' column to integer type.")
-             except ValueError:
-                 print("ERROR: Could not convert 'Month' column to integer. Data might be malformed.")
-                 return None, None
+    def _prefix_sums(self):
+        """
+        Get running sums over the months in order, for O(1) window means.
 
+        Returns:
+            tuple: (sums, counts) of shape [months + 1, 2] and [months + 1],
+            where entry i covers the first i months and missing months add nothing.
+        """
+        if 'prefix' not in self._aggregates:
+            flat = self._complete().reshape(-1, 2)
+            present = ~np.isnan(flat[:, 0])
+            sums = np.zeros((len(flat) + 1, 2))
+            np.cumsum(np.where(present[:, None], flat, 0.0), axis=0, out=sums[1:])
+            counts = np.concatenate([[0], np.cumsum(present)])
+            self._aggregates['prefix'] = sums, counts
+        return self._aggregates['prefix']
 
-        filtered_data = df[(df['Month'] == month_int) & (df['Year'] == year_int)]
+    def seasonal(self):
+        """
+        Get the mean of every season of every year.
 
-        # **DEBUG: Print filtered data**
-        print("DEBUG: Filtered data:")
-        print(filtered_data)
+        The months are shifted by one so each year starts with the December
+        before, after which every season is a block of three months: one
+        reshape and a NaN-aware mean. The table is computed once and kept.
 
+        Returns:
+            numpy.ndarray: Array of shape [years, 4, 2] indexed by year - first_year
+            and the season's position in SEASONS, averaging the months with data.
+            Seasons with no data are NaN.
+        """
+        if 'season' not in self._aggregates:
+            flat = self._complete().reshape(-1, 2)
+            shifted = np.concatenate([np.full((1, 2), np.nan), flat[:-1]])
+            self._aggregates['season'] = _nanmean(shifted.reshape(len(self.values), 4, 3, 2), axis=2)
+        return self._aggregates['season']
 
-        if filtered_data.empty:
-            print(f"No data found for {month_int}/{year_int}")
+    def decadal(self):
+        """
+        Get the mean of every calendar month across each decade, e.g. July in the 1950s.
+
+        The years are padded out to whole decades so the table reshapes to
+        [decades, 10, 12, 2] and reduces in one NaN-aware mean. The table is
+        computed once and kept.
+
+        Returns:
+            numpy.ndarray: Array of shape [decades, 12, 2] indexed by
+            (decade - first_decade) // 10 and month - 1. Months with no data are NaN.
+        """
+        if 'decade' not in self._aggregates:
+            lead = self.first_year - self.first_decade
+            decades = -(-(lead + len(self.values)) // 10)
+            padded = np.full((decades * 10, 12, 2), np.nan)
+            padded[lead:lead + len(self.values)] = self._complete()
+            self._aggregates['decade'] = _nanmean(padded.reshape(decades, 10, 12, 2), axis=1)
+        return self._aggregates['decade']
+
+    def rolling(self, window=12):
+        """
+        Get the trailing rolling mean ending at every month.
+
+        Each window is the difference of two running sums, so the whole table
+        costs the same whatever the window length. Tables are kept per window.
+
+        Args:
+            window (int): Number of months in each window, including the last one.
+
+        Returns:
+            numpy.ndarray: Array of shape [years, 12, 2] like values, averaging the
+            months with data in each window. Windows that start before the first
+            year or hold no data are NaN.
+
+        Raises:
+            InvalidQueryError: If window is not a whole number of at least 1.
+        """
+        if isinstance(window, bool) or not isinstance(window, (int, np.integer)) or window < 1:
+            raise InvalidQueryError(f"Rolling window must be a whole number of at least 1 month, got {window!r}")
+        key = ('rolling', int(window))
+        if key not in self._aggregates:
+            sums, counts = self._prefix_sums()
+            totals = np.full((len(counts) - 1, 2), np.nan)
+            months = np.full(len(counts) - 1, 0)
+            # A window longer than the table leaves every month NaN
+            window = min(window, len(counts))
+            totals[window - 1:] = sums[window:] - sums[:len(sums) - window]
+            months[window - 1:] = counts[window:] - counts[:len(counts) - window]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(months[:, None] > 0, totals / months[:, None], np.nan)
+            self._aggregates[key] = means.reshape(self.values.shape)
+        return self._aggregates[key]
+
+    def season_mean(self, season, start_year, end_year=None):
+        """
+        Get the average temperature and rainfall of a season over one or more years.
+
+        For example season_mean("summer", 1950, 1959) is the 1950s summer average.
+
+        Args:
+            season (str): Season name, one of SEASONS.
+            start_year (int): First year.
+            end_year (int): Last year (inclusive). Defaults to start_year.
+
+        Returns:
+            tuple: (average temperature, average rainfall) or (None, None) if there is no data.
+
+        Raises:
+            InvalidQueryError: If season is not one of SEASONS.
+        """
+        if season not in SEASONS:
+            raise InvalidQueryError(f"Season must be one of {', '.join(SEASONS)}, got {season!r}")
+        if end_year is None:
+            end_year = start_year
+        start = max(start_year - self.first_year, 0)
+        end = max(end_year - self.first_year + 1, 0)
+        rows = self.seasonal()[start:end, list(SEASONS).index(season)]
+        if not len(rows):
             return None, None
+        return _weather_pair(_nanmean(rows, axis=0))
 
-        # Calculate average temperature and rainfall
-        temp = filtered_data['tem'].mean()
-        rain = filtered_data['rain'].mean()
+    def decade_mean(self, decade, month=None):
+        """
+        Get the average temperature and rainfall of a decade, or of one month in it.
 
-        # Handle NaN values
-        if np.isnan(temp) or np.isnan(rain):
-            print(f"Warning: Missing data for {month_int}/{year_int}")
+        Args:
+            decade (int): Any year of the decade, e.g. 1950 for the 1950s.
+            month (int): Month number (1-12). The whole decade is averaged if omitted.
+
+        Returns:
+            tuple: (average temperature, average rainfall) or (None, None) if there is no data.
+        """
+        row = (decade - self.first_decade) // 10
+        table = self.decadal()
+        if not (0 <= row < len(table)):
+            return None, None
+        if month is None:
+            return _weather_pair(_nanmean(table[row], axis=0))
+        if not (1 <= month <= 12):
+            return None, None
+        return _weather_pair(table[row, month - 1])
+
+    def rolling_mean(self, month, year, window=12):
+        """
+        Get the average temperature and rainfall of the window of months ending at a month.
+
+        For example rolling_mean(12, 2000) is the 12-month average for 2000.
+
+        Args:
+            month (int): Month number (1-12) of the last month in the window.
+            year (int): Year of the last month in the window.
+            window (int): Number of months in the window.
+
+        Returns:
+            tuple: (average temperature, average rainfall) or (None, None) if there is no data.
+
+        Raises:
+            InvalidQueryError: If window is not a whole number of at least 1.
+        """
+        table = self.rolling(window)
+        row = year - self.first_year
+        if not (0 <= row < len(self.values)) or not (1 <= month <= 12):
+            return None, None
+        return _weather_pair(table[row, month - 1])
+
+    def range_mean(self, start, end):
+        """
+        Get the average temperature and rainfall over an inclusive range of months.
+
+        Answered from running sums in constant time however long the range is.
+
+        Args:
+            start (tuple): (month, year) of the first month.
+            end (tuple): (month, year) of the last month.
+
+        Returns:
+            tuple: (average temperature, average rainfall) of the months with data
+            in the range, or (None, None) if there are none.
+
+        Raises:
+            InvalidQueryError: If a month is not between 1 and 12 or end is before start.
+        """
+        for month, _ in (start, end):
+            if not 1 <= month <= 12:
+                raise InvalidQueryError(f"Month must be between 1 and 12, got {month}")
+        if (end[1], end[0]) < (start[1], start[0]):
+            raise InvalidQueryError(f"Range must not end before it starts, got {start} to {end}")
+        sums, counts = self._prefix_sums()
+        first = min(max((start[1] - self.first_year) * 12 + start[0] - 1, 0), len(counts) - 1)
+        last = min(max((end[1] - self.first_year) * 12 + end[0], 0), len(counts) - 1)
+        months = counts[last] - counts[first]
+        if months <= 0:
             return None, None
+        temp, rain = (sums[last] - sums[first]) / months
+        return float(temp), float(rain)
+
+
+def build_weather_index(df, recorder=None):
+    """
+    Build a WeatherIndex for fast repeated lookups.
+
+    Args:
+        df (pandas.DataFrame or numpy.ndarray): The weather data, as a DataFrame
+            from load_data or a structured array from load_table.
+        recorder (instrumentation.StageRecorder): Records the build duration and index size.
+            Instrumentation is off if omitted.
+
+    Returns:
+        WeatherIndex: The lookup table, or None if the data is invalid.
+    """
+    if df is None:
+        return None
+
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+
+    try:
+        with recorder.stage("build_weather_index") as record:
+            if isinstance(df, np.ndarray):
+                index = WeatherIndex.from_table(df)
+            else:
+                index = WeatherIndex.from_dataframe(df)
+            record["bytes"] = index.values.nbytes
+        return index
+    except KeyError as e:
+        logger.error("Error: Required column not found in data: %s", e)
+        return None
+    except Exception as e:
+        logger.error("Error building weather index: %s", e)
+        return None
+
+def lookup_weather(df, month, year):
+    """
+    Get the average temperature and rainfall for a specific month and year.
 
+    Unlike get_weather_data, failures are raised rather than logged, so
+    high-volume callers pay only for the lookup.
+
+    Args:
+        df (pandas.DataFrame or WeatherIndex): The weather data. A WeatherIndex
+            gives constant-time lookups instead of filtering the whole DataFrame.
+        month (int or str): Month number (1-12).
+        year (int or str): Year.
+
+    Returns:
+        tuple: (average temperature, average rainfall).
+
+    Raises:
+        InvalidQueryError: If month or year is not a number, or month is out of range.
+        NoDataError: If there is no data for the month and year.
+        KeyError: If the DataFrame lacks a required column.
+    """
+    try:
+        month_int = int(month)
+        year_int = int(year)
+    except (TypeError, ValueError):
+        raise InvalidQueryError("Month and year must be valid numbers") from None
+
+    if not (1 <= month_int <= 12):
+        raise InvalidQueryError(f"Month must be between 1 and 12, got {month_int}")
+
+    if isinstance(df, WeatherIndex):
+        temp, rain = df.lookup(month_int, year_int)
+        if temp is None:
+            raise NoDataError(f"No data found for {month_int}/{year_int}")
         return temp, rain
 
-    except ValueError:
-        print("Error: Month and year must be valid numbers")
+    # Ensure 'Month' column is integer type for comparison; converted once, later calls skip this
+    if df['Month'].dtype.kind != 'i':
+        try:
+            df['Month'] = df['Month'].astype(int)
+        except ValueError:
+            raise WeatherDataError("Could not convert 'Month' column to integer. Data might be malformed.") from None
+        logger.debug("Converted 'Month' column to integer type.")
+
+    filtered_data = df[(df['Month'] == month_int) & (df['Year'] == year_int)]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Filtered data for %d/%d:\n%s", month_int, year_int, filtered_data)
+
+    if filtered_data.empty:
+        raise NoDataError(f"No data found for {month_int}/{year_int}")
+
+    # Calculate average temperature and rainfall
+    temp = filtered_data['tem'].mean()
+    rain = filtered_data['rain'].mean()
+
+    # Handle NaN values
+    if np.isnan(temp) or np.isnan(rain):
+        raise NoDataError(f"Missing data for {month_int}/{year_int}")
+
+    return temp, rain
+
+
+def get_weather_data(df, month, year, recorder=None):
+    """
+    Extract average temperature and rainfall for a specific month and year.
+
+    Passing a WeatherIndex instead of the DataFrame uses its constant-time
+    lookup rather than filtering the whole DataFrame. Failures are logged and
+    reported as (None, None); use lookup_weather to get them as exceptions.
+
+    Args:
+        df (pandas.DataFrame or WeatherIndex): The weather data.
+        month (str): Month number (1-12).
+        year (str): Year (1901-2023).
+        recorder (instrumentation.StageRecorder): Records the lookup duration.
+            Instrumentation is off if omitted.
+
+    Returns:
+        tuple: (average temperature, average rainfall) or (None, None) if data not found.
+    """
+    if df is None:
+        return None, None
+
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+
+    try:
+        with recorder.stage("get_weather_data", month=month, year=year, indexed=isinstance(df, WeatherIndex)):
+            return lookup_weather(df, month, year)
+    except NoDataError as e:
+        logger.info("%s", e)
+        return None, None
+    except WeatherDataError as e:
+        logger.error("Error: %s", e)
         return None, None
     except KeyError as e:
-        print(f"Error: Required column not found in data: {e}")
+        logger.error("Error: Required column not found in data: %s", e)
         return None, None
     except Exception as e:
-        print(f"Error processing weather data: {e}")
+        logger.error("Error processing weather data: %s", e)
         return None, None
 
+
 def get_available_years(df):
     """
     Get the range of available years in the dataset.
 
     Args:
-        df (pandas.DataFrame): DataFrame containing the weather data.
+        df (pandas.DataFrame or WeatherIndex): The weather data.
 
     Returns:
         tuple: (min_year, max_year) or (None, None) if data is invalid.
     """
+    if isinstance(df, WeatherIndex):
+        return df.first_year, df.last_year
+
     if df is None or 'Year' not in df.columns:
         return None, None
 
@@ -128,5 +873,76 @@ def get_available_years(df):
         max_year = df['Year'].max()
         return min_year, max_year
     except Exception as e:
-        print(f"Error getting available years: {e}")
+        logger.error("Error getting available years: %s", e)
         return None, None
+
+def iter_monthly_weather(df):
+    """
+    Iterate over every (year, month) in the dataset with its averaged values.
+
+    Args:
+        df (pandas.DataFrame or WeatherIndex): The weather data.
+
+    Yields:
+        tuple: (year, month, average temperature, average rainfall), ordered by year then month.
+    """
+    if df is None:
+        return
+
+    if isinstance(df, WeatherIndex):
+        for row, year in enumerate(df.years):
+            for month in range(1, 13):
+                temp, rain = df.values[row, month - 1]
+                if not (np.isnan(temp) or np.isnan(rain)):
+                    yield int(year), month, float(temp), float(rain)
+        return
+
+    grouped = df.groupby(['Year', 'Month'], sort=True)[['tem', 'rain']].mean()
+    for (year, month), row in grouped.iterrows():
+        if np.isnan(row['tem']) or np.isnan(row['rain']):
+            continue
+        yield int(year), int(month), float(row['tem']), float(row['rain'])
+
+
+def iter_period_weather(df, period='month', window=12):
+    """
+    Iterate over every period of a kind in the dataset with its averaged values.
+
+    Args:
+        df (pandas.DataFrame or WeatherIndex): The weather data.
+        period (str): One of PERIODS: "month" for each month, "season" for each
+            season of each year, "decade" for each calendar month of each decade,
+            or "rolling" for the window of months ending at each month.
+        window (int): Number of months in each rolling window.
+
+    Yields:
+        tuple: (key, average temperature, average rainfall) in time order, where key is
+        (year, month) for months and rolling windows, (year, season name) for seasons
+        and (decade, month) for decades.
+
+    Raises:
+        InvalidQueryError: If period is not one of PERIODS.
+    """
+    if period not in PERIODS:
+        raise InvalidQueryError(f"Period must be one of {', '.join(PERIODS)}, got {period!r}")
+    if df is None:
+        return
+
+    if period == 'month':
+        for year, month, temp, rain in iter_monthly_weather(df):
+            yield (year, month), temp, rain
+        return
+
+    index = df if isinstance(df, WeatherIndex) else build_weather_index(df)
+    if index is None:
+        return
+    if period == 'season':
+        table, first, step, names = index.seasonal(), index.first_year, 1, list(SEASONS)
+    elif period == 'decade':
+        table, first, step, names = index.decadal(), index.first_decade, 10, range(1, 13)
+    else:
+        table, first, step, names = index.rolling(window), index.first_year, 1, range(1, 13)
+    present = ~np.isnan(table).any(axis=2)
+    for row, column in zip(*np.nonzero(present)):
+        temp, rain = table[row, column]
+        yield (first + int(row) * step, names[column]), float(temp), float(rain)
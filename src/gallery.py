@@ -0,0 +1,343 @@
+import argparse
+import calendar
+import html
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import data_processor
+import art_generator
+import batch_render
+import render_cache
+
+GALLERY_FORMAT_VERSION = 1
+MANIFEST_NAME = "index.json"
+HTML_NAME = "index.html"
+THUMBNAIL_SIZE = 256
+
+
+def entry_key(month, year):
+    """Return the manifest key of a month, e.g. "1999-06"."""
+    return f"{year}-{month:02d}"
+
+
+def _number(value, digits=3):
+    """Round a statistic for JSON, turning NaN into null."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def load_manifest(gallery_dir):
+    """
+    Read the entries of an existing gallery.
+
+    Args:
+        gallery_dir (str): The gallery directory.
+
+    Returns:
+        dict: Entries keyed by entry_key, empty if there is no readable manifest.
+    """
+    path = os.path.join(gallery_dir, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable gallery manifest {path}: {e}")
+        return {}
+    if manifest.get("format") != GALLERY_FORMAT_VERSION:
+        return {}
+    return {entry_key(entry["month"], entry["year"]): entry for entry in manifest.get("entries", [])}
+
+
+def is_stale(entry, temp, rain, size, thumbnail_size, gallery_dir):
+    """
+    Check whether a gallery entry has to be rendered again.
+
+    An entry is stale when it is missing, its weather values changed, it was
+    rendered by another RENDER_VERSION or at another size, or a file is gone.
+    """
+    if entry is None:
+        return True
+    if (entry.get("temp"), entry.get("rain")) != (temp, rain):
+        return True
+    if (entry.get("render_version"), entry.get("size"), entry.get("thumbnail_size")) != (
+        render_cache.RENDER_VERSION, size, thumbnail_size
+    ):
+        return True
+    return not all(os.path.exists(os.path.join(gallery_dir, entry[name])) for name in ("image", "thumbnail"))
+
+
+def plan_gallery(index, gallery_dir, size=art_generator.DEFAULT_SIZE[0], thumbnail_size=THUMBNAIL_SIZE, force=False):
+    """
+    Compare the dataset with the existing gallery.
+
+    Args:
+        index (data_processor.WeatherIndex): The weather data.
+        gallery_dir (str): The gallery directory.
+        size (int): Width and height of the artwork in pixels.
+        thumbnail_size (int): Width and height of the thumbnails in pixels.
+        force (bool): Treat every entry as stale.
+
+    Returns:
+        tuple: (entries, jobs, removed) where entries maps entry_key to the entry
+        of every month with data, jobs lists the (month, year, temp, rain,
+        image path, thumbnail path) tuples to render and removed lists entries
+        of months no longer in the data.
+    """
+    previous = load_manifest(gallery_dir)
+    month_temp_mean = index.statistics()["month"]["temp_mean"]
+    entries = {}
+    jobs = []
+    for year, month, temp, rain in data_processor.iter_monthly_weather(index):
+        key = entry_key(month, year)
+        image = os.path.relpath(batch_render.output_path_for(os.path.join(gallery_dir, "art"), month, year), gallery_dir)
+        thumbnail = os.path.relpath(batch_render.output_path_for(os.path.join(gallery_dir, "thumbs"), month, year), gallery_dir)
+        entries[key] = {
+            "year": year,
+            "month": month,
+            "temp": temp,
+            "rain": rain,
+            "temp_anomaly": _number(temp - month_temp_mean[month - 1]),
+            "seed": render_cache.seed_for(month, year),
+            "render_version": render_cache.RENDER_VERSION,
+            "size": size,
+            "thumbnail_size": thumbnail_size,
+            "image": image,
+            "thumbnail": thumbnail,
+        }
+        if force or is_stale(previous.get(key), temp, rain, size, thumbnail_size, gallery_dir):
+            jobs.append((month, year, temp, rain, os.path.join(gallery_dir, image), os.path.join(gallery_dir, thumbnail)))
+    removed = [entry for key, entry in previous.items() if key not in entries]
+    return entries, jobs, removed
+
+
+def render_entry(job, size, thumbnail_size):
+    """
+    Render the artwork and thumbnail of one gallery entry. Runs inside a worker process.
+
+    The thumbnail is downscaled from the full render, and both files are
+    written under temporary names and moved into place once complete.
+
+    Args:
+        job (tuple): (month, year, temp, rain, image path, thumbnail path) as produced by plan_gallery.
+        size (int): Width and height of the artwork in pixels.
+        thumbnail_size (int): Width and height of the thumbnail in pixels.
+
+    Returns:
+        tuple: (month, year, ok).
+    """
+    month, year, temp, rain, image_path, thumbnail_path = job
+    partial_paths = []
+    for path in (image_path, thumbnail_path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        root, ext = os.path.splitext(path)
+        partial_paths.append(f"{root}.partial{ext}")
+
+    img = art_generator.generate_art(
+        temp, rain, output_path=partial_paths[0], seed=render_cache.seed_for(month, year),
+        size=(size, size), returns="image",
+    )
+    if img is None:
+        return month, year, False
+    thumbnail = img.resize((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    thumbnail.save(partial_paths[1])
+    os.replace(partial_paths[0], image_path)
+    os.replace(partial_paths[1], thumbnail_path)
+    return month, year, True
+
+
+def statistics_json(index):
+    """Convert WeatherIndex.statistics() to JSON-ready per-year and per-month records."""
+    stats = index.statistics()
+    years = [
+        {"year": int(year), **{name: _number(values[row]) for name, values in stats["year"].items()}}
+        for row, year in enumerate(index.years)
+        if stats["year"]["months"][row]
+    ]
+    months = [
+        {"month": month, **{name: _number(values[month - 1]) for name, values in stats["month"].items()}}
+        for month in range(1, 13)
+    ]
+    return {"years": years, "months": months}
+
+
+def write_manifest(gallery_dir, entries, statistics):
+    """Write index.json atomically."""
+    manifest = {
+        "format": GALLERY_FORMAT_VERSION,
+        "render_version": render_cache.RENDER_VERSION,
+        "statistics": statistics,
+        "entries": [entries[key] for key in sorted(entries)],
+    }
+    path = os.path.join(gallery_dir, MANIFEST_NAME)
+    with open(f"{path}.partial", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{path}.partial", path)
+
+
+def render_html(entries, statistics):
+    """
+    Build the gallery page: the monthly climate table, then a thumbnail grid per year.
+
+    Args:
+        entries (dict): Gallery entries keyed by entry_key.
+        statistics (dict): Output of statistics_json.
+
+    Returns:
+        str: The HTML document.
+    """
+    esc = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8"><title>Weather as Art</title>',
+        "<style>",
+        "body{font-family:sans-serif;margin:2em;background:#fafafa;color:#222}",
+        "table{border-collapse:collapse;margin-bottom:2em}td,th{padding:.2em .8em;text-align:right}",
+        ".grid{display:flex;flex-wrap:wrap;gap:8px}",
+        ".grid a{text-decoration:none;color:inherit;font-size:.8em;text-align:center}",
+        ".grid img{display:block}",
+        "</style></head><body>",
+        "<h1>Weather as Art</h1>",
+        "<h2>Monthly climate</h2>",
+        "<table><tr><th>Month</th><th>Mean °C</th><th>Min °C</th><th>Max °C</th><th>Mean rain mm</th></tr>",
+    ]
+    for month in statistics["months"]:
+        if not month["years"]:
+            continue
+        parts.append(
+            f"<tr><td>{calendar.month_abbr[month['month']]}</td><td>{month['temp_mean']:.1f}</td>"
+            f"<td>{month['temp_min']:.1f}</td><td>{month['temp_max']:.1f}</td><td>{month['rain_mean']:.1f}</td></tr>"
+        )
+    parts.append("</table>")
+
+    by_year = {}
+    for key in sorted(entries):
+        by_year.setdefault(entries[key]["year"], []).append(entries[key])
+    for year in statistics["years"]:
+        year_entries = by_year.get(year["year"])
+        if not year_entries:
+            continue
+        parts.append(
+            f'<section id="y{year["year"]}"><h2>{year["year"]}</h2>'
+            f"<p>Mean {year['temp_mean']:.1f}°C ({year['temp_min']:.1f} to {year['temp_max']:.1f}°C), "
+            f"{year['rain_total']:.0f}mm of rain over {year['months']} months</p><div class=\"grid\">"
+        )
+        for entry in year_entries:
+            name = f"{calendar.month_name[entry['month']]} {entry['year']}"
+            anomaly = entry["temp_anomaly"]
+            title = f"{name}: {entry['temp']:.1f}°C ({anomaly:+.1f}°C vs. average), {entry['rain']:.1f}mm"
+            parts.append(
+                f'<a href="{esc(entry["image"])}" title="{esc(title)}">'
+                f'<img src="{esc(entry["thumbnail"])}" width="{entry["thumbnail_size"]}" '
+                f'height="{entry["thumbnail_size"]}" loading="lazy" alt="{esc(name)}">'
+                f"{calendar.month_abbr[entry['month']]} · {entry['temp']:.1f}°C · {entry['rain']:.0f}mm</a>"
+            )
+        parts.append("</div></section>")
+    parts.append("</body></html>")
+    return "\n".join(parts) + "\n"
+
+
+def build_gallery(index, gallery_dir, size=art_generator.DEFAULT_SIZE[0], thumbnail_size=THUMBNAIL_SIZE,
+                  workers=None, chunksize=4, force=False):
+    """
+    Build or update a browsable gallery of every month in the dataset.
+
+    Only months that are new, whose values changed, or whose files are
+    missing are rendered, so rebuilding after a data update is incremental.
+    Files of months that left the dataset are deleted. The manifest is
+    written even if rendering is interrupted, keeping finished work.
+
+    Args:
+        index (data_processor.WeatherIndex): The weather data.
+        gallery_dir (str): Directory to write the gallery to.
+        size (int): Width and height of the artwork in pixels.
+        thumbnail_size (int): Width and height of the thumbnails in pixels.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        chunksize (int): Number of jobs handed to a worker at a time.
+        force (bool): Re-render every entry.
+
+    Returns:
+        tuple: (rendered, failed, reused) counts.
+    """
+    os.makedirs(gallery_dir, exist_ok=True)
+    entries, jobs, removed = plan_gallery(index, gallery_dir, size, thumbnail_size, force)
+    statistics = statistics_json(index)
+    for entry in removed:
+        for name in ("image", "thumbnail"):
+            try:
+                os.remove(os.path.join(gallery_dir, entry[name]))
+            except FileNotFoundError:
+                pass
+
+    total = len(jobs)
+    reused = len(entries) - total
+    print(f"{total} entries to render, {reused} up to date, {len(removed)} removed")
+    # Entries being rendered only join the manifest once their files are in place
+    pending = {entry_key(job[0], job[1]) for job in jobs}
+    finished = {key: entry for key, entry in entries.items() if key not in pending}
+
+    rendered = 0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(render_entry, jobs, [size] * total, [thumbnail_size] * total, chunksize=chunksize)
+                for done, (month, year, ok) in enumerate(results, 1):
+                    key = entry_key(month, year)
+                    if ok:
+                        rendered += 1
+                        finished[key] = entries[key]
+                    else:
+                        failed += 1
+                    elapsed = time.perf_counter() - start
+                    status = "done" if ok else "failed"
+                    print(f"[{done}/{total}] {month:02d}/{year} {status}, {elapsed:.0f}s elapsed")
+    finally:
+        write_manifest(gallery_dir, finished, statistics)
+        with open(os.path.join(gallery_dir, HTML_NAME), "w", encoding="utf-8") as f:
+            f.write(render_html(finished, statistics))
+
+    return rendered, failed, reused
+
+
+def main(argv=None):
+    """Command line entry point for building the gallery."""
+    parser = argparse.ArgumentParser(description="Build a browsable gallery of every month in the dataset.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--output-dir", default="gallery", help="Directory to write the gallery to.")
+    parser.add_argument("--size", type=int, default=art_generator.DEFAULT_SIZE[0], help="Artwork width and height in pixels.")
+    parser.add_argument("--thumbnail-size", type=int, default=THUMBNAIL_SIZE, help="Thumbnail width and height in pixels.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=4, help="Jobs handed to a worker at a time.")
+    parser.add_argument("--force", action="store_true", help="Re-render every entry.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    index = data_processor.build_weather_index(data_processor.load_table(args.data))
+    if index is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+
+    rendered, failed, reused = build_gallery(
+        index, args.output_dir, size=args.size, thumbnail_size=args.thumbnail_size, workers=args.workers,
+        chunksize=args.chunksize, force=args.force,
+    )
+    print(f"\nRendered {rendered}, failed {failed}, up to date {reused}")
+    print(f"Gallery written to {os.path.join(args.output_dir, HTML_NAME)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
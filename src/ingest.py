@@ -0,0 +1,30 @@
+import argparse
+import logging
+import sys
+
+import data_processor
+
+
+def main(argv=None):
+    """Command line entry point for streaming a large weather CSV into monthly aggregates."""
+    parser = argparse.ArgumentParser(
+        description="Reduce a large daily or multi-station weather CSV to per-month aggregates."
+    )
+    parser.add_argument("input", help="Path to the large CSV file with Year, Month, tem and rain columns.")
+    parser.add_argument("--output", default="data/aggregated.csv", help="Where to write the aggregate table.")
+    parser.add_argument("--chunksize", type=int, default=data_processor.DEFAULT_CHUNKSIZE, help="Rows read per chunk.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    aggregates = data_processor.aggregate_csv(args.input, chunksize=args.chunksize)
+    if aggregates is None:
+        print(f"Failed to aggregate {args.input}")
+        return 1
+
+    aggregates.to_csv(args.output, index=False)
+    print(f"Wrote {len(aggregates)} months to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,11 @@
 import data_processor
-import art_generator
+import background_writer
+import prefetch
+import render_cache
+import argparse
+import contextlib
 import os
-import sys
-from PIL import Image, ImageTk
-# Fallback if PIL is not installed
-try:
-    from PIL import Image, ImageTk
-except ImportError:
-    print("PIL not installed. Image display may not work.")
-    # Define a fallback function for Image.open
-    class DummyImage:
-        def __init__(self, path):
-            self.path = path
-        def show(self):
-            print(f"Would display image at {self.path} if PIL was installed")
-    Image = type('Image', (), {'open': lambda path: DummyImage(path)})
+import logging
 
 def display_banner():
     """Display a welcome banner for the application."""
@@ -48,13 +39,26 @@ def validate_input(prompt, min_val, max_val):
         except ValueError:
             print("Please enter a valid number.")
 
-def main():
+def main(argv=None):
     """Main function to run the Weather Art Generator application."""
+    parser = argparse.ArgumentParser(description="Turn a month of weather data into artwork, interactively.")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Render the months around each query in the background, so stepping through months is instant.")
+    parser.add_argument("--prefetch-size", type=int, default=prefetch.DEFAULT_CAPACITY,
+                        help="Prefetched images kept in memory.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     display_banner()
 
-    # Load data file
+    # Load data file, memory-mapping the binary table cached from the CSV when it is up to date
     csv_path = "data/Temp_and_rain.csv"
-    df = data_processor.load_data(csv_path)
+    table = data_processor.load_table(csv_path)
+    if table is None:
+        print(f"Failed to load data from {csv_path}")
+        return
+
+    # Build the (year, month) lookup table once so each query is constant time
+    df = data_processor.build_weather_index(table)
     if df is None:
         print(f"Failed to load data from {csv_path}")
         return
@@ -67,7 +71,50 @@ def main():
 
     print(f"\nData available from {min_year} to {max_year}")
 
-    # Main application loop
+    with contextlib.ExitStack() as stack:
+        prefetcher = writer = None
+        if args.prefetch:
+            # Warm worker with the data loaded, plus a writer so saving never delays the next query
+            prefetcher = stack.enter_context(
+                prefetch.Prefetcher(df, capacity=args.prefetch_size, cache=render_cache.RenderCache())
+            )
+            writer = stack.enter_context(background_writer.BackgroundWriter())
+            print("Prefetching nearby months in the background")
+        run_queries(df, min_year, max_year, prefetcher, writer)
+
+    print("\nThank you for using Weather Art Generator! Goodbye. 👋")
+
+
+def render_query(month, year, temp, rain, image_path, prefetcher=None, writer=None):
+    """
+    Get the artwork for a query and save it to image_path.
+
+    Without a prefetcher the render goes through the render cache and is
+    saved before returning. With one, the image comes from the prefetcher
+    and is saved in the background by writer.
+
+    Returns:
+        PIL.Image.Image: The artwork, or None if it could not be generated.
+    """
+    if prefetcher is None:
+        return render_cache.cached_generate_art(
+            temp, rain, render_cache.seed_for(month, year), output_path=image_path, returns="image"
+        )
+    try:
+        img = prefetcher.get(month, year)
+    except Exception as e:
+        print(f"Error generating artwork: {e}")
+        return None
+    if img is not None:
+        def report(save):
+            if save.exception() is not None:
+                print(f"Could not save {image_path}: {save.exception()}")
+        writer.submit(img, image_path).add_done_callback(report)
+    return img
+
+
+def run_queries(df, min_year, max_year, prefetcher=None, writer=None):
+    """Prompt for months until the user quits, showing the artwork of each."""
     while True:
         print("\nEnter 'q' at any prompt to quit")
 
@@ -90,14 +137,14 @@ def main():
 
             # Generate artwork
             print("\n🎨 Generating artwork based on weather data...")
-            image_path = art_generator.generate_art(temp, rain)
+            image_path = "artwork.png"
+            img = render_query(month, year, temp, rain, image_path, prefetcher, writer)
 
-            if image_path:
+            if img is not None:
                 print(f"✅ Artwork generated successfully!")
 
                 # Try to display the image
                 try:
-                    img = Image.open(image_path)
                     img.show()
                     print(f"\nArtwork saved as {image_path}")
                 except Exception as e:
@@ -110,7 +157,5 @@ def main():
 
         print("\n" + "-" * 40)
 
-    print("\nThank you for using Weather Art Generator! Goodbye. 👋")
-
 if __name__ == "__main__":
     main()
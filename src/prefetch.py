@@ -0,0 +1,159 @@
+import collections
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PIL import Image
+
+import art_generator
+import render_cache
+
+# Full-size renders are ~4 MB each in memory
+DEFAULT_CAPACITY = 8
+
+# (months, years) offsets rendered ahead of the user, most likely next step first
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def shift_month(month, year, months=0, years=0):
+    """
+    Step a (month, year) by a number of months and years, crossing year boundaries.
+
+    Returns:
+        tuple: The shifted (month, year).
+    """
+    index = (year + years) * 12 + (month - 1) + months
+    return index % 12 + 1, index // 12
+
+
+class Prefetcher:
+    """
+    Keeps a warm render worker that draws the months around the last one viewed.
+
+    After each get(), the neighbouring months are queued on a background
+    thread, which has the dataset and every import already loaded. When the
+    user steps to one of them, the image is usually finished and get()
+    returns at once. Images are held in memory in a bounded least-recently-used
+    cache. Queued speculative renders are dropped as soon as the user asks
+    for something else, so they never delay the month actually requested.
+
+        with Prefetcher(index) as prefetcher:
+            img = prefetcher.get(6, 1999)   # renders June, queues July, May, ...
+            img = prefetcher.get(7, 1999)   # usually ready
+    """
+
+    def __init__(self, index, capacity=DEFAULT_CAPACITY, cache=None, neighbours=NEIGHBOURS):
+        """
+        Args:
+            index (data_processor.WeatherIndex): The weather data.
+            capacity (int): Images kept in memory. At least 1 + len(neighbours), so
+                prefetched months are not evicted before the user can step to them.
+            cache (render_cache.RenderCache): On-disk render cache to read finished
+                renders from before rendering. Not consulted if omitted.
+            neighbours (tuple): (months, years) offsets to render ahead.
+        """
+        self.index = index
+        self.capacity = max(capacity, 1 + len(neighbours))
+        self.cache = cache
+        self.neighbours = neighbours
+        self.hits = 0
+        self.misses = 0
+        self._images = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def render(self, month, year):
+        """
+        Render one month at full size, or load it from the render cache.
+
+        Returns:
+            PIL.Image.Image: The artwork, or None if there is no data for the month.
+        """
+        temp, rain = self.index.lookup(month, year)
+        if temp is None:
+            return None
+        seed = render_cache.seed_for(month, year)
+        if self.cache is not None:
+            cached_path = self.cache.get(render_cache.cache_key(temp, rain, art_generator.DEFAULT_SIZE, seed))
+            if cached_path is not None:
+                try:
+                    with Image.open(cached_path) as img:
+                        return img.convert("RGB")
+                except FileNotFoundError:
+                    pass  # Evicted by another process between lookup and open
+        return art_generator.render_art(temp, rain, seed=seed)
+
+    def get(self, month, year):
+        """
+        Get the artwork for a month, then start rendering the months around it.
+
+        A month that was prefetched is returned from memory, waiting for it
+        if its render is still running. Any other month, or one whose
+        prefetch failed, is rendered on the calling thread.
+
+        Args:
+            month (int): Month number (1-12).
+            year (int): Year.
+
+        Returns:
+            PIL.Image.Image: The artwork, or None if there is no data for the month.
+        """
+        key = (month, year)
+        with self._lock:
+            future = self._images.get(key)
+            if future is not None and future.cancelled():
+                future = None
+            # The user moved on: drop speculative renders that have not started
+            for other, pending in list(self._images.items()):
+                if pending is not future and pending.cancel():
+                    del self._images[other]
+            if future is not None:
+                self._images.move_to_end(key)
+
+        if future is not None:
+            try:
+                img = future.result()
+                self.hits += 1
+            except Exception:
+                # Forget the failed render so it is retried below rather than re-raised on every visit
+                with self._lock:
+                    if self._images.get(key) is future:
+                        del self._images[key]
+                future = None
+        if future is None:
+            self.misses += 1
+            img = self.render(month, year)
+            future = Future()
+            future.set_result(img)
+            with self._lock:
+                self._images[key] = future
+                self._trim()
+
+        self.prefetch(month, year)
+        return img
+
+    def prefetch(self, month, year):
+        """Queue renders of the neighbours of a month that are not cached yet."""
+        with self._lock:
+            for months, years in self.neighbours:
+                key = shift_month(month, year, months, years)
+                if key in self._images or self.index.lookup(*key)[0] is None:
+                    continue
+                self._images[key] = self._executor.submit(self.render, *key)
+            self._trim()
+
+    def _trim(self):
+        """Drop the least recently used images beyond capacity. Call with the lock held."""
+        while len(self._images) > self.capacity:
+            _, future = self._images.popitem(last=False)
+            future.cancel()
+
+    def close(self):
+        """Stop the worker, dropping queued renders."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
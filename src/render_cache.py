@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from PIL import Image
+
+import art_generator
+
+# Bump when the artwork for a given (temp, rain, size, seed, preview, format) changes so stale entries are not served
+RENDER_VERSION = 3
+
+DEFAULT_CACHE_DIR = ".art_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def seed_for(month, year):
+    """
+    Derive a stable render seed for a month and year.
+
+    Args:
+        month (int): Month number (1-12).
+        year (int): Year.
+
+    Returns:
+        int: The seed, e.g. 199906 for June 1999.
+    """
+    return int(year) * 100 + int(month)
+
+
+def cache_key(temp, rain, size, seed, preview=False, image_format="PNG"):
+    """
+    Build the content address of a render.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        size (tuple): (width, height) of the artwork.
+        seed (int): Render seed.
+        preview (bool): Whether the artwork is a low-resolution preview.
+        image_format (str): Pillow format name the artwork is encoded in.
+
+    Returns:
+        str: Hex SHA-256 digest identifying the artwork.
+    """
+    payload = json.dumps(
+        {
+            "version": RENDER_VERSION, "temp": float(temp), "rain": float(rain), "size": list(size), "seed": seed,
+            "preview": bool(preview), "format": image_format,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of rendered images with size-bounded LRU eviction.
+
+    Entries are stored as "<key>.<format>" in the cache directory, e.g. "<key>.png". The file
+    modification time records the last access, so the least recently used
+    entries are evicted first once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached images.
+            max_bytes (int): Upper bound on the total size of cached images.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key, image_format="PNG"):
+        """Return the path a cache entry in image_format is stored at."""
+        return os.path.join(self.cache_dir, f"{key}.{image_format.lower()}")
+
+    def get(self, key, image_format="PNG"):
+        """
+        Look up a cached render and mark it as recently used.
+
+        Args:
+            key (str): Cache key from cache_key().
+            image_format (str): Pillow format name the key was built with.
+
+        Returns:
+            str: Path to the cached image, or None on a miss.
+        """
+        path = self.path_for(key, image_format)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, source_path, image_format="PNG"):
+        """
+        Store a rendered image in the cache and evict old entries if needed.
+
+        Args:
+            key (str): Cache key from cache_key().
+            source_path (str): Path of the rendered image to copy in.
+            image_format (str): Pillow format name the image is encoded in.
+
+        Returns:
+            str: Path to the cached image.
+        """
+        path = self.path_for(key, image_format)
+        partial_path = f"{path}.{os.getpid()}-{threading.get_ident()}.partial"
+        shutil.copyfile(source_path, partial_path)
+        os.replace(partial_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".partial"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def cached_generate_art(temp, rain, seed, output_path="artwork.png", cache=None, returns="path",
+                        size=None, preview=False):
+    """
+    Generate artwork, serving it from the render cache when the same request was seen before.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        seed (int): Render seed. Identical inputs and seed give identical artwork.
+        output_path (str): Where to save the artwork. Must be a file path, the format
+            is inferred from its extension.
+        cache (RenderCache): Cache to use. A cache in DEFAULT_CACHE_DIR is used if omitted.
+        returns (str): "path" to return the output path or "image" to return the PIL image.
+        size (tuple): (width, height) of the artwork. Defaults to the full render size.
+        preview (bool): Render a low-resolution preview, see art_generator.render_art.
+
+    Returns:
+        The artwork in the form selected by returns if successful, None otherwise.
+    """
+    if temp is None or rain is None:
+        return art_generator.generate_art(
+            temp, rain, output_path=output_path, seed=seed, returns=returns, size=size, preview=preview
+        )
+
+    if not isinstance(output_path, str):
+        print("Error: Cached artwork can only be saved to a file path.")
+        return None
+    if cache is None:
+        cache = RenderCache()
+
+    if size is None:
+        size = art_generator.PREVIEW_SIZE if preview else art_generator.DEFAULT_SIZE
+    image_format = art_generator.format_for_path(output_path)
+    key = cache_key(temp, rain, size, seed, preview, image_format)
+    cached_path = cache.get(key, image_format)
+    if cached_path is not None:
+        try:
+            partial_path = art_generator.partial_path_for(output_path)
+            shutil.copyfile(cached_path, partial_path)
+            os.replace(partial_path, output_path)
+            print(f"Artwork loaded from cache: {output_path}")
+            if returns == "image":
+                return Image.open(output_path)
+            return output_path
+        except FileNotFoundError:
+            pass  # Evicted by another process between lookup and copy
+
+    result = art_generator.generate_art(
+        temp, rain, output_path=output_path, seed=seed, image_format=image_format, returns=returns, size=size,
+        preview=preview,
+    )
+    if result is not None:
+        cache.put(key, output_path, image_format)
+    return result
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import logging
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit, parse_qs
+
+import data_processor
+import art_generator
+import render_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_LINE = 8192
+
+# How far temp and rain may go past the dataset's range. Shape counts grow with
+# rain, so unbounded values would tie up a render worker indefinitely.
+TEMP_MARGIN = 10.0
+RAIN_MARGIN = 0.5  # Fraction of the dataset's maximum rainfall
+MAX_SEED = 2 ** 32 - 1
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def render_png(temp, rain, seed):
+    """
+    Render artwork to PNG bytes. Runs inside a worker process.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        seed (int): Render seed.
+
+    Returns:
+        bytes: The encoded PNG, or None if rendering failed.
+    """
+    return art_generator.generate_art(temp, rain, output_path=None, seed=seed, returns="bytes")
+
+
+class ArtServer:
+    """
+    Minimal asyncio HTTP server that renders weather art on demand.
+
+    Endpoints:
+        GET /art?month=<1-12>&year=<year>           Artwork for a month in the dataset.
+        GET /art?temp=<celsius>&rain=<mm>[&seed=<n>] Artwork for arbitrary values.
+
+    HEAD is answered like GET without the body. It still renders the artwork, so
+    Content-Length is exact, and shares the render with any identical GET.
+
+    Rendering runs in a bounded process pool so the event loop is never blocked,
+    and concurrent requests for the same artwork share a single render.
+    """
+
+    def __init__(self, index, workers=None):
+        """
+        Args:
+            index (data_processor.WeatherIndex): Weather data, loaded once at startup.
+            workers (int): Number of render processes. Defaults to the CPU count.
+        """
+        self.index = index
+        temp_min, temp_max, rain_max = index.value_bounds()
+        self.temp_range = (temp_min - TEMP_MARGIN, temp_max + TEMP_MARGIN)
+        self.rain_range = (0.0, rain_max * (1 + RAIN_MARGIN))
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.in_flight = {}
+
+    async def render(self, temp, rain, seed):
+        """
+        Render artwork, joining an identical render that is already in progress.
+
+        Args:
+            temp (float): The average temperature in Celsius.
+            rain (float): The average rainfall in mm.
+            seed (int): Render seed.
+
+        Returns:
+            bytes: The encoded PNG, or None if rendering failed.
+
+        Raises:
+            BrokenProcessPool: If a worker process died, e.g. killed for running out of memory.
+        """
+        key = (temp, rain, seed)
+        future = self.in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, render_png, temp, rain, seed)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def replace_executor(self, broken):
+        """
+        Start a new process pool in place of one whose worker died.
+
+        Concurrent requests on the broken pool all fail together, so the pool
+        is only replaced if no earlier request has done so already.
+
+        Args:
+            broken (ProcessPoolExecutor): The pool the failed render ran on.
+        """
+        if self.executor is broken:
+            logger.error("Error: A render worker died, restarting the process pool.")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def resolve(self, query):
+        """
+        Turn query parameters into render arguments.
+
+        Args:
+            query (dict): Parsed query string from parse_qs.
+
+        Returns:
+            tuple: (status, temp, rain, seed, error message).
+        """
+        def param(name):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            if param("month") is not None or param("year") is not None:
+                month, year = int(param("month")), int(param("year"))
+                if not 1 <= month <= 12:
+                    return 400, None, None, None, "month must be between 1 and 12"
+                temp, rain = self.index.lookup(month, year)
+                if temp is None:
+                    return 404, None, None, None, f"No data found for {month}/{year}"
+                return 200, temp, rain, render_cache.seed_for(month, year), None
+            if param("temp") is not None and param("rain") is not None:
+                temp, rain = float(param("temp")), float(param("rain"))
+                seed = int(param("seed")) if param("seed") is not None else 0
+            else:
+                return 400, None, None, None, "Expected month and year, or temp and rain"
+        except (TypeError, ValueError):
+            return 400, None, None, None, "Parameters must be valid numbers"
+
+        if not (math.isfinite(temp) and math.isfinite(rain)):
+            return 400, None, None, None, "temp and rain must be finite"
+        for name, value, (low, high) in (("temp", temp, self.temp_range), ("rain", rain, self.rain_range)):
+            if not low <= value <= high:
+                return 400, None, None, None, f"{name} must be between {low:g} and {high:g}"
+        if not 0 <= seed <= MAX_SEED:
+            return 400, None, None, None, f"seed must be between 0 and {MAX_SEED}"
+        return 200, temp, rain, seed, None
+
+    async def handle(self, reader, writer):
+        """Serve a single HTTP request and close the connection."""
+        try:
+            request_line = await reader.readline()
+            if not request_line or len(request_line) > MAX_REQUEST_LINE:
+                return
+            # Drain the headers, they are not used
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                await self.respond(writer, 400, b"Malformed request line\n")
+                return
+            method, target = parts[0], parts[1]
+            url = urlsplit(target)
+
+            if url.path != "/art":
+                await self.respond(writer, 404, b"Not found\n")
+                return
+            if method not in ("GET", "HEAD"):
+                await self.respond(writer, 405, b"Only GET and HEAD are supported\n")
+                return
+
+            status, temp, rain, seed, error = self.resolve(parse_qs(url.query))
+            if status != 200:
+                await self.respond(writer, status, f"{error}\n".encode("utf-8"))
+                return
+
+            executor = self.executor
+            try:
+                png = await self.render(temp, rain, seed)
+            except BrokenProcessPool:
+                self.replace_executor(executor)
+                png = None
+            if png is None:
+                await self.respond(writer, 500, b"Failed to generate artwork\n")
+                return
+            await self.respond(writer, 200, png, "image/png", send_body=method == "GET")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, body, content_type="text/plain; charset=utf-8", send_body=True):
+        """Write an HTTP/1.1 response."""
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+        if send_body:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host, port):
+        """Listen for requests until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving weather art on http://{host}:{port}/art")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    """Command line entry point for the render service."""
+    parser = argparse.ArgumentParser(description="Serve weather art over HTTP.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of render processes (default: CPU count).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    index = data_processor.build_weather_index(data_processor.load_table(args.data))
+    if index is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+
+    try:
+        asyncio.run(ArtServer(index, workers=args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+import argparse
+import contextlib
+import logging
+import math
+import os
+import random
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import data_processor
+import art_generator
+import batched_shapes
+import instrumentation
+import render_cache
+
+DEFAULT_TILE_SIZE = 1024
+
+# Area the info label may cover in the top left corner, in reference pixels
+LABEL_EXTENT = (300, 40)
+
+# How far a tile's canvas may reach left and up past the tile, in tiles, see tile_canvas_origin
+MAX_OVERLAP = 1
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class RecordingDraw:
+    """
+    Stand-in for ImageDraw that records draw calls instead of rasterizing them.
+
+    The shape code draws into it once on the reference canvas, and the
+    recorded display list is replayed tile by tile. The list grows with the
+    number of shapes, not with the output resolution.
+    """
+
+    def __init__(self):
+        self.ops = []
+
+    def ellipse(self, xy, **kwargs):
+        self.ops.append(("ellipse", xy, kwargs))
+
+    def rectangle(self, xy, **kwargs):
+        self.ops.append(("rectangle", xy, kwargs))
+
+    def polygon(self, xy, **kwargs):
+        self.ops.append(("polygon", xy, kwargs))
+
+    def line(self, xy, **kwargs):
+        self.ops.append(("line", xy, kwargs))
+
+
+def op_bounds(op, scale):
+    """
+    Get the bounding box a recorded draw call covers in output pixels.
+
+    Args:
+        op (tuple): (method name, coordinates, keyword arguments) from RecordingDraw.
+        scale (float): Output pixels per reference pixel.
+
+    Returns:
+        tuple: (x0, y0, x1, y1), padded for line width and rasterization.
+    """
+    name, xy, kwargs = op
+    if isinstance(xy[0], (tuple, list)):
+        xs = [p[0] for p in xy]
+        ys = [p[1] for p in xy]
+    else:
+        xs = xy[0::2]
+        ys = xy[1::2]
+    pad = 2
+    if name == "line":
+        pad += max(1, round(kwargs.get("width", 0) * scale)) / 2
+    return min(xs) * scale - pad, min(ys) * scale - pad, max(xs) * scale + pad, max(ys) * scale + pad
+
+
+def bin_ops(ops, scale, size, tile_size):
+    """
+    Assign every draw call to the tiles it overlaps.
+
+    Args:
+        ops (list): Display list from RecordingDraw.
+        scale (float): Output pixels per reference pixel.
+        size (tuple): (width, height) of the output.
+        tile_size (int): Tile width and height in pixels.
+
+    Returns:
+        list: Rows of tiles, each tile a list of its draw calls in drawing order.
+    """
+    width, height = size
+    columns, rows = math.ceil(width / tile_size), math.ceil(height / tile_size)
+    tiles = [[[] for _ in range(columns)] for _ in range(rows)]
+    for op in ops:
+        x0, y0, x1, y1 = op_bounds(op, scale)
+        c0, c1 = max(0, int(x0 // tile_size)), min(columns - 1, int(x1 // tile_size))
+        r0, r1 = max(0, int(y0 // tile_size)), min(rows - 1, int(y1 // tile_size))
+        for r in range(r0, r1 + 1):
+            row = tiles[r]
+            for c in range(c0, c1 + 1):
+                row[c].append(op)
+    return tiles
+
+
+def tile_canvas_origin(box, ops, scale, max_overlap):
+    """
+    Get where to start the canvas a tile is drawn on so its shapes rasterize as in render_art.
+
+    ImageDraw truncates fractional coordinates towards zero, so a shape that
+    starts left of or above its canvas lands on slightly different pixels than
+    on the full image. The canvas is extended left and up to the start of the
+    tile's shapes, by at most max_overlap pixels, and cropped after drawing.
+
+    Args:
+        box (tuple): (x0, y0, x1, y1) of the tile in output pixels.
+        ops (list): The tile's draw calls.
+        scale (float): Output pixels per reference pixel.
+        max_overlap (int): Largest extension in pixels.
+
+    Returns:
+        tuple: (x, y) of the canvas's top left corner in output pixels.
+    """
+    x0, y0 = box[0], box[1]
+    left, top = x0, y0
+    for op in ops:
+        bounds = op_bounds(op, scale)
+        left, top = min(left, bounds[0]), min(top, bounds[1])
+    return (
+        max(0, x0 - max_overlap, math.floor(left)),
+        max(0, y0 - max_overlap, math.floor(top)),
+    )
+
+
+def render_tile(box, origin, background, ops, scale, texture_seed, label):
+    """
+    Rasterize one tile. Runs inside a worker process when tiles are rendered in parallel.
+
+    Args:
+        box (tuple): (x0, y0, x1, y1) of the tile in output pixels.
+        origin (tuple): Top left corner of the canvas the shapes are drawn on, from tile_canvas_origin.
+        background (tuple): RGB background color.
+        ops (list): The tile's draw calls, in drawing order.
+        scale (float): Output pixels per reference pixel.
+        texture_seed (tuple): Seed of the tile's texture.
+        label (tuple): (temp, rain) if the info label overlaps the tile, None otherwise.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape [tile height, tile width, 3].
+    """
+    x0, y0, x1, y1 = box
+    ox, oy = origin
+    img = Image.new('RGB', (x1 - ox, y1 - oy), background)
+    draw = art_generator.ScaledDraw(ImageDraw.Draw(img, 'RGBA'), scale, origin=origin)
+    for name, xy, kwargs in ops:
+        getattr(draw, name)(xy, **kwargs)
+    if origin != (x0, y0):
+        img = img.crop((x0 - ox, y0 - oy, x1 - ox, y1 - oy))
+    art_generator.apply_texture(img, art_generator.make_texture(img.size, np.random.default_rng(texture_seed)))
+    if label is not None:
+        art_generator.draw_label(img, *label, scale, origin=(x0, y0))
+    return np.asarray(img)
+
+
+class PngStreamWriter:
+    """
+    Writes an 8-bit RGB PNG a band of rows at a time.
+
+    Rows are filtered and deflated as they arrive, so only the current band
+    and the compressor state are held in memory, never the whole image.
+    """
+
+    def __init__(self, file, width, height, compress_level=6):
+        """
+        Args:
+            file (file-like): Binary file to write to.
+            width (int): Image width in pixels.
+            height (int): Image height in pixels.
+            compress_level (int): zlib compression level, 0-9.
+        """
+        self.file = file
+        self.compressor = zlib.compressobj(compress_level)
+        file.write(PNG_SIGNATURE)
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def chunk(self, kind, data):
+        """Write one PNG chunk."""
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, rows):
+        """
+        Encode the next rows of the image.
+
+        Args:
+            rows (numpy.ndarray): uint8 array of shape [rows, width, 3].
+        """
+        flat = rows.reshape(len(rows), -1)
+        # Sub filter: each byte minus the same channel of the pixel to its left, modulo 256
+        filtered = np.empty((flat.shape[0], flat.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:4] = flat[:, :3]
+        np.subtract(flat[:, 3:], flat[:, :-3], out=filtered[:, 4:])
+        data = self.compressor.compress(filtered)
+        if data:
+            self.chunk(b"IDAT", data)
+
+    def close(self):
+        """Flush the compressor and end the image."""
+        self.chunk(b"IDAT", self.compressor.flush())
+        self.chunk(b"IEND", b"")
+
+
+def render_tiled(temp, rain, output, size, tile_size=DEFAULT_TILE_SIZE, seed=None, batched=True,
+                 workers=None, recorder=None, compress_level=6):
+    """
+    Render artwork tile by tile and stream it into a PNG.
+
+    The shapes are generated once as a display list on the reference canvas
+    and each draw call is assigned to the tiles it overlaps. Tiles are then
+    rasterized one row at a time, optionally in parallel, and each finished
+    row is encoded before the row after next is started. Peak memory is two
+    rows of tiles, plus up to four tiles' worth of canvas per tile being
+    drawn, however tall the image is.
+
+    Shapes match render_art for the same seed, see tile_canvas_origin, unless
+    a shape starts more than a tile left of or above a tile it reaches into,
+    e.g. a long river at poster sizes with small tiles. Such shapes may land
+    up to a pixel off. The texture is generated per tile, so it has
+    the same density but not the same pixels.
+
+    If rendering fails, the partially written output file is removed.
+
+    Args:
+        temp (float): The average temperature in Celsius.
+        rain (float): The average rainfall in mm.
+        output (str or file-like): Path or binary file to write the PNG to.
+        size (tuple): (width, height) of the artwork.
+        tile_size (int): Tile width and height in pixels.
+        seed (int): Seed for the random generator. A random seed is used if omitted.
+        batched (bool): Use the batched shape generation path (see art_generator.render_art).
+        workers (int): Number of render processes. Tiles are rendered in this process if omitted.
+        recorder (instrumentation.StageRecorder): Records the duration of each stage.
+        compress_level (int): zlib compression level, 0-9.
+    """
+    if recorder is None:
+        recorder = instrumentation.NULL_RECORDER
+    rng = random.Random(seed)
+    width, height = size
+    scale, ref_width, ref_height, density = art_generator.reference_canvas(size)
+
+    with recorder.stage("shapes", batched=batched) as record:
+        display = RecordingDraw()
+        if batched:
+            batched_shapes.draw_band_shapes(
+                display, np.random.default_rng(rng.getrandbits(64)), temp, rain, ref_width, ref_height, density
+            )
+        else:
+            art_generator.draw_shapes(display, rng, temp, rain, ref_width, ref_height, density)
+        tiles = bin_ops(display.ops, scale, size, tile_size)
+        record["ops"] = len(display.ops)
+    texture_base = rng.getrandbits(64)
+    background = art_generator.background_color(temp)
+    label_width, label_height = LABEL_EXTENT[0] * scale, LABEL_EXTENT[1] * scale
+
+    def tile_jobs(r):
+        y0, y1 = r * tile_size, min(height, (r + 1) * tile_size)
+        for c, ops in enumerate(tiles[r]):
+            x0, x1 = c * tile_size, min(width, (c + 1) * tile_size)
+            label = (temp, rain) if x0 < label_width and y0 < label_height else None
+            box = (x0, y0, x1, y1)
+            origin = tile_canvas_origin(box, ops, scale, MAX_OVERLAP * tile_size)
+            yield box, origin, background, ops, scale, (texture_base, r, c), label
+
+    partial_path = art_generator.partial_path_for(output) if isinstance(output, str) else None
+    try:
+        with contextlib.ExitStack() as stack:
+            executor = None
+            if workers and workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            f = stack.enter_context(open(partial_path, "wb")) if partial_path is not None else output
+
+            def start_row(r):
+                if executor is None:
+                    return list(tile_jobs(r))
+                return [executor.submit(render_tile, *job) for job in tile_jobs(r)]
+
+            def finish_row(pending):
+                if executor is None:
+                    return [render_tile(*job) for job in pending]
+                return [future.result() for future in pending]
+
+            writer = PngStreamWriter(f, width, height, compress_level)
+            pending = start_row(0)
+            for r in range(len(tiles)):
+                with recorder.stage("tile_row", row=r, tiles=len(tiles[r])) as record:
+                    # Queue the next row so workers keep busy while this one is encoded
+                    upcoming = start_row(r + 1) if r + 1 < len(tiles) else None
+                    band = np.hstack(finish_row(pending))
+                    writer.write_rows(band)
+                    record["bytes"] = band.nbytes
+                    pending = upcoming
+            writer.close()
+    except BaseException:
+        if partial_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(partial_path)
+        raise
+
+    if partial_path is not None:
+        os.replace(partial_path, output)
+
+
+def main(argv=None):
+    """Command line entry point for poster-size renders."""
+    parser = argparse.ArgumentParser(description="Render print-size artwork for one month with bounded memory.")
+    parser.add_argument("--data", default="data/Temp_and_rain.csv", help="Path to the weather CSV file.")
+    parser.add_argument("--month", type=int, required=True, help="Month (1-12).")
+    parser.add_argument("--year", type=int, required=True, help="Year.")
+    parser.add_argument("--size", type=int, default=8000, help="Width and height of the artwork in pixels.")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE, help="Tile width and height in pixels.")
+    parser.add_argument("--output", default="poster.png", help="PNG file to write.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of render processes (default: render in this process).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    index = data_processor.build_weather_index(data_processor.load_table(args.data))
+    if index is None:
+        print(f"Failed to load data from {args.data}")
+        return 1
+    temp, rain = data_processor.get_weather_data(index, args.month, args.year)
+    if temp is None:
+        print(f"No data found for {args.month}/{args.year}")
+        return 1
+
+    result = art_generator.generate_art(
+        temp, rain, output_path=args.output, seed=render_cache.seed_for(args.month, args.year),
+        size=(args.size, args.size), tile_size=args.tile_size, tile_workers=args.workers,
+    )
+    return 0 if result else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())